@@ -15,6 +15,37 @@ from termcolor import colored
 # case insensitive wrapper enforcing that re methods actually have an impact
 Regex = regex.Regex()
 
+# Broadcast column (float/integer or quoted string) directly followed by its alias. Compiled once at import time.
+broadcast_alias = re.compile(
+    r"""({numbers}|{strings})\s+(?P<alias>`?([a-zA-Z]\w*|"\d\w*")`?)""".format(
+        numbers=r"\b(\d+\.)?\d+\b",  # Floats & integers
+        strings=r"""(`|'|").*?(`|'|")"""  # Careful, non greedy match around quote marks
+    ),
+    flags=re.IGNORECASE
+)
+
+
+def _balanced_parenthesis(depth: int) -> str:
+    """Build a pattern matching content with balanced parenthesis, nested up to depth levels.
+    Quoted literals (with backslash escapes) are matched as a whole, so a parenthesis inside them is ignored.
+    Alternatives start with disjoint characters so matching stays linear.
+
+    Args:
+        depth (int): Maximum number of nested parenthesis levels
+
+    Returns:
+        str: Regex pattern
+    """
+    literal = r"'(?:[^'\\]|\\.)*'"
+    pattern = r"(?:[^()']|{})*".format(literal)
+    for _ in range(depth):
+        pattern = r"(?:[^()']|{}|\({}\))*".format(literal, pattern)
+    return pattern
+
+
+# Content of explode(...), built once at import time
+explode_content = _balanced_parenthesis(10)
+
 
 class _GlobalTranslator():
     def __init__(self):
@@ -26,7 +57,7 @@ class GlobalHiveToPresto(_GlobalTranslator):
         self.from_language = "Hive"
         self.to_language = "Presto"
         with open(os.path.join(os.path.dirname(__file__), "..", "reserved_keywords", "reserved_keywords.json")) as f:
-            self.reserved_keywords = [rkwarg.upper() for rkwarg in json.load(f)["content"]]
+            self.reserved_keywords = {rkwarg.upper() for rkwarg in json.load(f)["content"]}  # Set for O(1) lookups
         self.gbt = GroupByTranslator()
 
     def translate_query(self, query: str) -> str:
@@ -118,6 +149,8 @@ class GlobalHiveToPresto(_GlobalTranslator):
         Returns:
             str: Transformed SQL
         """
+        if "[" not in query:  # Fast exit, no array indexing to shift
+            return query
         return Regex.sub(
             r"\[(\d+)\]",
             lambda match: f"[{int(match.group(1))+1}]",
@@ -134,6 +167,8 @@ class GlobalHiveToPresto(_GlobalTranslator):
         Returns:
             str: Transformed SQL
         """
+        if "rlike" not in query.lower():  # Fast exit, the regex would not match anyway
+            return query
         return Regex.sub(
             r"\brlike\b",
             "like",
@@ -150,6 +185,8 @@ class GlobalHiveToPresto(_GlobalTranslator):
         Returns:
             str: Transformed SQL
         """
+        if "over" not in query.lower():  # Fast exit, the regex would not match anyway
+            return query
         return Regex.sub(
             r"\bover\s+\(",
             "over(",
@@ -167,8 +204,13 @@ class GlobalHiveToPresto(_GlobalTranslator):
         Returns:
             str: Transformed SQL
         """
+        if "lateral" not in query.lower():  # Fast exit. Not "lateral view" as any whitespace can separate the keywords
+            return query
         return Regex.sub(
-            r"lateral\s+view\s+explode\s*\((?P<explode_content>.+)\)\s+(?P<name>{vtn})(\s+as)\s+(?P<alias>{vtn})".format(vtn=utils.valid_presto_table_names),
+            r"lateral\s+view\s+explode\s*\((?P<explode_content>{ec})\)\s+(?P<name>{vtn})(\s+as)\s+(?P<alias>{vtn})".format(
+                ec=explode_content,
+                vtn=utils.valid_presto_table_names
+            ),
             lambda match: f"CROSS JOIN unnest({match['explode_content']}) AS {match['name']} {utils.function_placeholder}({match['alias']})",
             query,
             strict=False
@@ -183,6 +225,8 @@ class GlobalHiveToPresto(_GlobalTranslator):
         Returns:
             str: Transformed SQL
         """
+        if "==" not in query:  # Fast exit, the regex would not match anyway
+            return query
         return Regex.sub(
             r"==",
             "=",
@@ -201,15 +245,14 @@ class GlobalHiveToPresto(_GlobalTranslator):
             str: Transformed SQL
         """
         ColumnCaster = utils.ColumnCaster()
-        logging.debug("Flattening SQL...")
+        logging.debug("Tokenizing SQL...")
         start = time.perf_counter()
-        flattened_tokens = list(sqlparse.parse(query)[0].flatten())  # Very intensive!
-        logging.debug(f"SQL was flattened in {time.perf_counter() - start} s!")
-        division_operators = sum([
-            True
-            for token in flattened_tokens
-            if token.ttype == Operator and token.value == "/"
-        ])  # Count how many operators there are
+        division_operators = sum(
+            1
+            for ttype, value in sqlparse.lexer.tokenize(query)  # Flat token stream is enough: skip the (very intensive) grouping
+            if ttype == Operator and value == "/"
+        )  # Count how many operators there are
+        logging.debug(f"SQL was tokenized in {time.perf_counter() - start} s!")
         logging.debug(f"Found {division_operators} division operator(s)")
 
         # Multi stage query copy/paste
@@ -236,18 +279,17 @@ class GlobalHiveToPresto(_GlobalTranslator):
         Returns:
             str: Transformed SQL
         """
-        def helper(match: re.match):
+        def helper(match: re.Match) -> str:
             alias = match.groupdict()["alias"]
-            if alias.upper() in self.reserved_keywords or alias.upper() in ("ASC", "DESC"):  # List of Presto reserved keywords
+            alias_upper = alias.upper()
+            if alias_upper in self.reserved_keywords or alias_upper in ("ASC", "DESC"):  # Set of Presto reserved keywords
                 return match.group()  # Not an alias but the continuation of the SQL logic
             else:
                 return match.group()[:-len(alias)] + "as " + alias
 
-        numbers = r"\b(\d+\.)?\d+\b"  # Floats & integers
-        strings = r"""(`|'|").*?(`|'|")"""  # Careful, non greedy match around quote marks
         return Regex.sub(
-            r"""({numbers}|{strings})\s+(?P<alias>`?([a-zA-Z]\w*|"\d\w*")`?)""".format(numbers=numbers, strings=strings),
-            lambda match: helper(match),
+            broadcast_alias,
+            helper,
             sql,
             strict=False
         )
@@ -261,8 +303,10 @@ class GlobalHiveToPresto(_GlobalTranslator):
         Returns:
             str: Transformed SQL
         """
+        if "interval" not in query.lower():  # Fast exit, the regex would not match anyway
+            return query
         return Regex.sub(
-            r"(interval\s+'.+?'\s+)as\s+(\w+)",
+            r"(interval\s+'[^']*'\s+)as\s+(\w+)",  # [^']* cannot run past the closing quote of the interval value
             lambda match: match.group(1) + match.group(2),
             query,
             strict=False
@@ -363,14 +407,14 @@ class GroupByTranslator():
         else:
             return options
 
-    def identifier_parser(self, token: Token) -> List[Optional[Tuple[Set[str], str]]]:
+    def identifier_parser(self, token: Token) -> List[Tuple[Set[str], Optional[str]]]:
         """Parse an identifier into expression + alias (if any)
 
         Args:
             token (Token): Identifier to parse
 
         Returns:
-            List[Optional[Tuple[Set[str], str]]]: Single entry list of a tuple containing the expression & the alias from the identifier
+            List[Tuple[Set[str], Optional[str]]]: Single entry list of a tuple containing the expression & the alias from the identifier
         """
         # Extract the real_name, which is everything but the alias
         if token.is_wildcard():  # A wildcard makes the column list incomplete.
@@ -391,14 +435,14 @@ class GroupByTranslator():
             else:
                 return [(self.breakdown_real_name(token, set()), None)]
 
-    def function_parser(self, token: Token) -> List[Tuple[Set[str], str]]:
+    def function_parser(self, token: Token) -> List[Tuple[Set[str], Optional[str]]]:
         """Parse a function into expression + alias (if any)
 
         Args:
             token (Token): Function token to parse
 
         Returns:
-            List[Tuple[Set[str], str]]: Single entry list of a tuple containing the expression & the alias from the function
+            List[Tuple[Set[str], Optional[str]]]: Single entry list of a tuple containing the expression & the alias from the function
         """
         return [(self.breakdown_real_name(token, set()), None)]  # Functions have no alias, so extract all content. Otherwise they are Identifiers
 
@@ -415,11 +459,11 @@ class GroupByTranslator():
         Returns:
             Optional[List[Tuple[Set[str], Optional[str]]]]: Optional list of select columns broken into their expression & alias (if applicable)
         """
-        seen_select = False
-        processed_select = False
-        to_be_returned = None
+        seen_select: bool = False
+        processed_select: bool = False
+        to_be_returned: Optional[List[Tuple[Set[str], Optional[str]]]] = None
         for parent_token in token.parent.tokens:
-            if parent_token.ttype == DML and parent_token.value.lower() == "select":  # Not sure to be the right select if there are union/union all!
+            if parent_token.ttype == DML and parent_token.normalized == "SELECT":  # Not sure to be the right select if there are union/union all!
                 seen_select = True
                 to_be_returned = None
                 processed_select = False  # Restart processing the select if it had been done (means it was not the right one)
@@ -436,7 +480,7 @@ class GroupByTranslator():
                     )
                 elif isinstance(parent_token, IdentifierList):  # More than 1 argument
                     print(f"IdentifierList found. Unzipping select columns ({len(parent_token.tokens)} columns)")
-                    select_columns = []
+                    select_columns: List[Tuple[Set[str], Optional[str]]] = []
                     for id_list_token in parent_token.tokens:  # Columns can be either Identifiers or Functions
                         if id_list_token.ttype == Wildcard:  # Wildcard found. The column list will not be exact. Aborting.
                             to_be_returned = []
@@ -517,7 +561,7 @@ class GroupByTranslator():
         Returns:
             str: Best Presto integer data type for the input integer.
         """
-        value = int(string_rep_integer)
+        value: int = int(string_rep_integer)
         if -2**7 <= value <= 2**7-1:
             return "tinyint"
         elif -2**15 <= value <= 2**15-1:
@@ -632,11 +676,13 @@ class GroupByTranslator():
         Returns:
             str: Output SQL
         """
+        if "group" not in sql.lower():  # Fast exit: no group by to fix, no need to parse the whole SQL
+            return sql
         new_sql = ""
         seen_group_by = False
         length = 0
         for token in sqlparse.parse(sql)[0].flatten():
-            if token.ttype == Keyword and token.value.lower() == "group by":
+            if token.ttype == Keyword and token.normalized == "GROUP BY":  # normalized is upper cased once by sqlparse for keywords
                 print("Found a group by! Let's validate its columns against the select part.")
                 new_sql += token.value
 
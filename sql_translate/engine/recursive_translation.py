@@ -5,6 +5,7 @@ from termcolor import colored
 import os
 import logging
 from pathlib import Path
+from types import MappingProxyType
 from typing import List, Dict, Tuple
 from sqlparse.sql import IdentifierList, Identifier, Comparison, Where, Parenthesis, TokenList, Function, Case, Operation, SquareBrackets, TypedLiteral
 from sqlparse.tokens import Keyword, DML, CTE, Whitespace, Newline, Punctuation, Number, Literal, Comment, Name, Operator, Wildcard, Token, Error
@@ -16,6 +17,26 @@ Regex = regex.Regex()
 SpecialFunctionHandlerHiveToPresto = special_functions_handling.SpecialFunctionHandlerHiveToPresto()
 
 
+def _load_function_dictionaries(path: str) -> MappingProxyType:
+    """Merges all the json function dictionaries found under a folder into a single read-only mapping.
+
+    Args:
+        path (str): Folder containing the function dictionaries
+
+    Returns:
+        MappingProxyType: Read-only view of {function name: definition}
+    """
+    functions = {}
+    for path_file in Path(path).rglob("*.json"):
+        with open(path_file) as f:
+            functions.update(json.load(f))
+    return MappingProxyType(functions)
+
+
+# Loaded once at import & shared by all the translator instances
+HIVE_TO_PRESTO_FUNCTIONS = _load_function_dictionaries(os.path.join(os.path.dirname(__file__), "..", "function_dictionaries", "hive_to_presto"))
+
+
 class _RecursiveTranslator():
     def __init__(self):
         pass
@@ -35,12 +56,7 @@ class RecursiveHiveToPresto(_RecursiveTranslator):
         }
         self.regex_hive_insert = utils.regex_hive_insert
 
-        # Grab all sub dictionaries and merge them into one
-        self.functions = {}
-        path_files = Path(os.path.join(os.path.dirname(__file__), "..", "function_dictionaries", "hive_to_presto")).rglob("*.json")
-        for path_file in path_files:
-            with open(path_file) as f:
-                self.functions = {**self.functions, **json.load(f)}  # Only load once at object creation
+        self.functions = HIVE_TO_PRESTO_FUNCTIONS  # Shared, read-only
 
     def translate_query(self, query: str, has_insert_statement: bool = True) -> str:
         """Translate an entire query from Hive to Presto
@@ -333,7 +349,8 @@ class RecursiveHiveToPresto(_RecursiveTranslator):
         else:
             return translated_function_call, self.functions[function_name]["returns"]
 
-    def _apply_compositions(self, str_output_arguments: List, compositions: List[Dict]) -> List:
+    @staticmethod
+    def _apply_compositions(str_output_arguments: List, compositions: List[Dict]) -> List:
         """Compositions allow you to manipulate arguments in creative ways to adjust for the difference in signatures.
 
         Args:
@@ -347,6 +364,7 @@ class RecursiveHiveToPresto(_RecursiveTranslator):
             List: Processed arguments
         """
         # Sanity checks & expand "end" keyword
+        expanded_compositions = []
         for composition in compositions:
             try:
                 if isinstance(composition["args"], list):
@@ -354,16 +372,18 @@ class RecursiveHiveToPresto(_RecursiveTranslator):
                     if len(composition["args"]) == 2:
                         if isinstance(composition["args"][1], str):  # Expand "end"
                             assert composition["args"][1] == "end"
-                            composition["args"] = list(range(composition["args"][0], len(str_output_arguments)))
+                            # Expand on a copy: the function dictionaries are shared & "end" depends on the number of arguments
+                            composition = {**composition, "args": list(range(composition["args"][0], len(str_output_arguments)))}
                     assert composition["args"] == list(range(composition["args"][0], composition["args"][-1]+1))  # Continuity
                 else:  # If not a list, can only be the "all" keyword
                     assert composition["args"] == "all"
             except AssertionError:
                 raise AssertionError(f"There are one or more errors with these composition arguments: {composition}")
+            expanded_compositions.append(composition)
 
         # Process compositions
         # 'arg' is the argument under consideration. 'args' is all the arguments (so a specific one can be accessed).
-        for idx, composition in enumerate(compositions):
+        for idx, composition in enumerate(expanded_compositions):
             if composition["args"] == "all":
                 if composition.get("as_group"):  # Outputs str, encapsulate in list for further processing
                     # print(f"all as group: {', '.join(str_output_arguments)}")
@@ -376,11 +396,11 @@ class RecursiveHiveToPresto(_RecursiveTranslator):
                 if composition.get("as_group"):
                     str_output_arguments = str_output_arguments[:composition["args"][0]] + \
                         [composition["formula"].format(arg=", ".join(str_output_arguments[composition["args"][0]:composition["args"][-1]+1]), args=str_output_arguments)] + \
-                        str_output_arguments[composition["args"][-1]:]
+                        str_output_arguments[composition["args"][-1]+1:]
                 elif composition.get("merged"):
                     str_output_arguments = str_output_arguments[:composition["args"][0]] + \
                         [composition["formula"].format(arg=" ".join(str_output_arguments[composition["args"][0]:composition["args"][-1]+1]), args=str_output_arguments)] + \
-                        str_output_arguments[composition["args"][-1]:]
+                        str_output_arguments[composition["args"][-1]+1:]
                 else:  # Apply composition to individual entries in str_output_arguments if index in composition["args"]. Otherwise, just copy.
                     str_output_arguments = [
                         composition["formula"].format(arg=str_output_arguments[idx], args=str_output_arguments) if idx in composition["args"] else str_output_arguments[idx]
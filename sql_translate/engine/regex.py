@@ -1,8 +1,23 @@
 import re
+import functools
 from typing import Union
 import logging
 
 
+@functools.lru_cache(maxsize=256)
+def _compile(pattern: str, flags: int) -> re.Pattern:
+    """Compile a regex pattern once and reuse it for all the subsequent calls with the same flags.
+
+    Args:
+        pattern (str): regex pattern
+        flags (int): re flags
+
+    Returns:
+        re.Pattern: compiled pattern
+    """
+    return re.compile(pattern, flags)
+
+
 class Regex():
     """Regex is a custom re wrapper for the purpose of SQL translation.
     It enforces that calls to re methods actually do something. Otherwise, exceptions are raised.
@@ -37,14 +52,14 @@ class Regex():
             if pattern not in self.blacklist:
                 logging.warning(self.msg[0].format(name=name, pattern=pattern, error_msg=error_msg, string=string))
 
-    def search(self, pattern: str, string: str, strict: bool = True, case_sensitive: bool = False) -> re.match:
+    def search(self, pattern: Union[str, re.Pattern], string: str, strict: bool = True, case_sensitive: bool = False) -> re.match:
         """Wrapper for re.search
         Enables to set two additional parameters so that an Exception is raised if the regex search fails.
         1. strict
         2. case_sensitive
 
         Args:
-            pattern (str): regex pattern
+            pattern (Union[str, re.Pattern]): regex pattern. If already compiled, its own flags are used and case_sensitive is ignored.
             string (str): string to search
             strict (bool, optional): if the strict flag is set and re.search returns None, an exception will be raised by _unexpected_behavior. Defaults to True.
             case_sensitive (bool, optional): if the case_sensitive flag is set, re.search is run without the re.IGNORECASE flag. Defaults to False.
@@ -52,22 +67,21 @@ class Regex():
         Returns:
             re.match: output of the re.search call
         """
-        if case_sensitive:
-            result = re.search(pattern, string)
-        else:
-            result = re.search(pattern, string, flags=re.IGNORECASE)
+        if not isinstance(pattern, re.Pattern):
+            pattern = _compile(pattern, 0 if case_sensitive else re.IGNORECASE)
+        result = pattern.search(string)
         if result:  # A match object was returned!
             return result
-        self._unexpected_behavior("search", pattern, "returned no result", string, strict)
+        self._unexpected_behavior("search", pattern.pattern, "returned no result", string, strict)
 
-    def sub(self, pattern: str, repl: Union[str, callable], string: str, strict: bool = True, case_sensitive: bool = False) -> str:
+    def sub(self, pattern: Union[str, re.Pattern], repl: Union[str, callable], string: str, strict: bool = True, case_sensitive: bool = False) -> str:
         """Wrapper for re.sub
         Enables to set two additional parameters so that an Exception is raised if the regex search fails.
         1. strict
         2. case_sensitive
 
         Args:
-            pattern (str): regex pattern
+            pattern (Union[str, re.Pattern]): regex pattern. If already compiled, its own flags are used and case_sensitive is ignored.
             repl (Union[str, callable]): replacement string
             string (str): string to search
             strict (bool, optional): if the strict flag is set and re.search returns None, an exception will be raised by _unexpected_behavior. Defaults to True.
@@ -76,10 +90,9 @@ class Regex():
         Returns:
             re.match: output of the re.search call
         """
-        if case_sensitive:
-            result = re.sub(pattern, repl, string)
-        else:
-            result = re.sub(pattern, repl, string, flags=re.IGNORECASE)
+        if not isinstance(pattern, re.Pattern):
+            pattern = _compile(pattern, 0 if case_sensitive else re.IGNORECASE)
+        result = pattern.sub(repl, string)
         if result == string:  # No substitution happened!
-            self._unexpected_behavior("sub", pattern, "did not yield any substitutions", string, strict)
+            self._unexpected_behavior("sub", pattern.pattern, "did not yield any substitutions", string, strict)
         return result  # Returns only if sub happened or non strict behavior
@@ -130,14 +130,10 @@ def get_path_active_hive_files(paths_job_folders: List[str], path_default_udf: s
             absolute_path = os.path.join(path_folder, file_name)
             with open(absolute_path) as f:
                 sql = f.read()
-            for query in sqlparse.parse(sql):  # Extract all queries from statement
-                for token in query.flatten():
-                    if token.ttype in (sqlparse.tokens.Keyword, sqlparse.tokens.DDL) and token.value.lower() in ddl_keywords:
-                        break
-                else:  # No DDL keyword found in this query
-                    continue  # Move to the next query in the statement
-                break
-            else:
+            for ttype, value in sqlparse.lexer.tokenize(sql):  # Flat token stream of all queries. No need for sqlparse's grouping
+                if ttype in (sqlparse.tokens.Keyword, sqlparse.tokens.DDL) and value.lower() in ddl_keywords:
+                    break
+            else:  # No DDL keyword found in any query
                 path_info.append({
                     "hive": absolute_path,
                     "presto": Regex.sub(r".hive$", ".presto", absolute_path),
@@ -234,8 +230,8 @@ def char_to_number(value: str, required_type: str) -> str:
         required_type (str): Output type desired (bigint or double)
 
     Raises:
-        Exception: The conversion to a python integer (using int built in method) failed
-        Exception: The conversion to a python float (using float built in method) failed
+        TypeError: The conversion to a python integer (using int built in method) failed
+        TypeError: The conversion to a python float (using float built in method) failed
         NotImplementedError: required_type was neither bigint nor double
 
     Returns:
@@ -251,7 +247,7 @@ def char_to_number(value: str, required_type: str) -> str:
                 f"A 'bigint' type is expected by Presto for this function, but {value} "
                 "was provided which either cannot be casted or does not seem to represent an integer."
             )
-            raise Exception(msg)
+            raise TypeError(msg)
     elif required_type == "double":
         try:
             assert f"{float(value)}" == value
@@ -261,7 +257,7 @@ def char_to_number(value: str, required_type: str) -> str:
                 f"A 'double' type is expected by Presto for this function, but {value} "
                 "was provided which either cannot be casted or does not seem to represent a float."
             )
-            raise Exception(msg)
+            raise TypeError(msg)
     else:
         raise NotImplementedError
 
@@ -10,7 +10,7 @@ import time
 import traceback
 import importlib
 from termcolor import colored
-from typing import List, Tuple, Dict, Union, Optional, Callable, Any
+from typing import List, Tuple, Dict, Union, Optional, Callable, Any, NamedTuple
 from sqlparse.sql import IdentifierList, Identifier, Comparison, Where, Parenthesis, TokenList, Function, Case, Operation
 from sqlparse.tokens import Keyword, DML, Whitespace, Newline, Punctuation, Number, Literal
 import pyodbc
@@ -113,6 +113,18 @@ class HiveToPresto(_Validator):
         with open(self.path_target_sql) as f:
             self.tgt_sql = f.read()
 
+    def _read_config(self, path_config: str) -> Dict:
+        """Read the config.json file holding the query parameters
+
+        Args:
+            path_config (str): Path to the config.json file
+
+        Returns:
+            Dict: Content of the config.json file
+        """
+        with open(path_config) as f:
+            return json.load(f)
+
     def _get_or_create_temp_udf(self, config_data: Dict, path_udf: str) -> Tuple[str, Dict[str, str], Dict[str, str]]:
         """Get or create a temporary udf file based on the real udf.
 
@@ -167,8 +179,7 @@ class HiveToPresto(_Validator):
         # I. Get all parameters to be formatted for the current src SQL
         # I.1. Read query parameters for self.path_src_sql
         path_config = os.path.join(os.path.dirname(self.path_src_sql), 'config.json')
-        with open(path_config) as f:
-            config_data = json.load(f)
+        config_data = self._read_config(path_config)
 
         # I.2. If needed, copy/paste the udf file and substitute custom cluster mentions. Load UDF
         path_udf_to_use, udf_mapping, query_parameters = self._get_or_create_temp_udf(config_data, path_udf)
@@ -424,7 +435,7 @@ class HiveToPresto(_Validator):
 
         validate_table_count = fetch(f"SELECT count(*) FROM {self.test_database}.{self.temp_tgt_table_properties['name']}", self.pconn)
         if validate_table_count[0][0] == 0:
-            print(colored(f"WARNING: After inserting into {self.test_database}.{self.temp_tgt_table_properties['name']} the count is still 0", "yellow"))
+            logging.warning(f"After inserting into {self.test_database}.{self.temp_tgt_table_properties['name']} the count is still 0")
         return validated_sql, duration
 
     def _presto_runner(self, sql: str, original_sql: str) -> str:
@@ -491,9 +502,9 @@ class HiveToPresto(_Validator):
         """
         iou = self.TableComparator.compare_tables(self.temp_src_table_properties, self.temp_tgt_table_properties)
         if not int(iou) == 1:
-            print(f"WARNING: {self.temp_src_table_properties['name']} and {self.temp_tgt_table_properties['name']} are not identical!")
+            logging.warning(f"{self.temp_src_table_properties['name']} and {self.temp_tgt_table_properties['name']} are not identical!")
         else:
-            print(f"{self.temp_src_table_properties['name']} and {self.temp_tgt_table_properties['name']} are identical!")
+            logging.info(f"{self.temp_src_table_properties['name']} and {self.temp_tgt_table_properties['name']} are identical!")
         return iou
 
     def validate_dml(self, path_original: str, path_translation: str, path_udf: str, path_config: str, database: str) -> Tuple[float, float, float]:
@@ -541,6 +552,17 @@ class HiveToPresto(_Validator):
         return self.compare_tables(), hive_run_time, presto_run_time
 
 
+class RowDifferences(NamedTuple):
+    """Row counts needed to calculate the IOU score between two tables, in the order of the comparison SQL labels"""
+    count_table_1: int
+    count_table_2: int
+    count_distinct_table_1: int
+    count_distinct_table_2: int
+    count_distinct_table_1_minus_table_2: int
+    count_distinct_table_2_minus_table_1: int
+    count_distinct_intersection: int
+
+
 class TableComparator():  # Should be mostly Hive/Presto agnostic
     def __init__(self, test_database: str, src_conn: pyodbc.Connection, tgt_conn: pyodbc.Connection) -> None:
         self.hconn = src_conn
@@ -612,7 +634,7 @@ class TableComparator():  # Should be mostly Hive/Presto agnostic
             if idx % 3 != 0 and counts_table_1[idx] != counts_table_2[idx]  # Discard data type comparison
         }  # All columns that have different counts accross both tables
 
-    def _compare_rows_between_two_tables(self, table_info_1: Dict, table_info_2: Dict) -> Dict[str, str]:
+    def _compare_rows_between_two_tables(self, table_info_1: Dict, table_info_2: Dict) -> RowDifferences:
         """Execute the SQL comparing two tables based on their IOU (Intersection Over Union) score
 
         Args:
@@ -620,7 +642,7 @@ class TableComparator():  # Should be mostly Hive/Presto agnostic
             table_info_2 (Dict): Table 2 info
 
         Returns:
-            Dict[str, str]: Result of the different components necessary to calculate the IOU score
+            RowDifferences: Result of the different components necessary to calculate the IOU score
         """
         from_table_1 = f"{self.test_database}.{table_info_1['name']}"
         from_table_2 = f"{self.test_database}.{table_info_2['name']}"
@@ -672,7 +694,8 @@ class TableComparator():  # Should be mostly Hive/Presto agnostic
         )
 
         print(sql)
-        return dict(fetch(sql, self.pconn))
+        # Labels are like '7_count_distinct_intersection': drop the ordering prefix to get the field name
+        return RowDifferences(**{label.split("_", 1)[1]: count for label, count in fetch(sql, self.pconn)})
 
     def compare_tables(self, table_info_1: Dict, table_info_2: Dict) -> float:
         """Main entry point to compare two tables
@@ -701,17 +724,17 @@ class TableComparator():  # Should be mostly Hive/Presto agnostic
         else:
             print(colored(f"Column count is identical between {table_info_1['name']} and {table_info_2['name']}!"))
 
-        if row_differences["7_count_distinct_intersection"] + \
-                row_differences["5_count_distinct_table_1_minus_table_2"] + \
-                row_differences["6_count_distinct_table_2_minus_table_1"] == 0 \
-                and row_differences["7_count_distinct_intersection"] == 0:
+        if row_differences.count_distinct_intersection + \
+                row_differences.count_distinct_table_1_minus_table_2 + \
+                row_differences.count_distinct_table_2_minus_table_1 == 0 \
+                and row_differences.count_distinct_intersection == 0:
             print(colored(f"WARNING: There are no rows in both tables {table_info_1['name']} and {table_info_2['name']}! Validated with iou = 1"))
             return 1
 
-        iou = row_differences["7_count_distinct_intersection"]/(
-            row_differences["7_count_distinct_intersection"] +
-            row_differences["5_count_distinct_table_1_minus_table_2"] +
-            row_differences["6_count_distinct_table_2_minus_table_1"]
+        iou = row_differences.count_distinct_intersection/(
+            row_differences.count_distinct_intersection +
+            row_differences.count_distinct_table_1_minus_table_2 +
+            row_differences.count_distinct_table_2_minus_table_1
         )
         print(colored(f"IOU (Intersection Over Union): {100*iou:.2f}%", "red"))
         if iou != 1:
@@ -0,0 +1,14 @@
+import pytest
+import sqlparse
+import sqlparse.engine.grouping
+import sqlparse.sql
+import sqlparse.tokens
+
+
+def pytest_configure(config) -> None:
+    config.addinivalue_line("markers", "slow: heavy parsing or disk I/O, deselect with -m \"not slow\"")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_sqlparse() -> None:
+    sqlparse.parse("select 1 from t where a in (1, 2)")  # Pay the one-time lexer/grouping initialization before the first test
@@ -1,31 +1,39 @@
 import pytest
 import sqlparse
 from typing import Tuple, List, Optional
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 from sql_translate.engine import global_translation
 from sql_translate import utils
 
-GHTP = global_translation.GlobalHiveToPresto()
+
+@pytest.fixture(scope="module")
+def ghtp() -> global_translation.GlobalHiveToPresto:
+    return global_translation.GlobalHiveToPresto()
+
+
+@pytest.fixture(scope="module")
+def gbt() -> global_translation.GroupByTranslator:
+    return global_translation.GroupByTranslator()
 
 
 def test_create_parent() -> None:
     _GlobalHiveToPresto = global_translation._GlobalTranslator()
 
 
-@patch('sql_translate.utils.protect_regex_curly_brackets', side_effect=lambda x: x)
-def test_translate_query(mock_protect_regex_curly_brackets: MagicMock) -> None:
+def _identity(x: str) -> str:
+    return x
+
+
+@patch('sql_translate.utils.protect_regex_curly_brackets', new=_identity)
+def test_translate_query() -> None:
     GHTP = global_translation.GlobalHiveToPresto()
-    GHTP._remove_dollar_sign = MagicMock(side_effect=lambda x: x)
-    GHTP._replace_double_quotes = MagicMock(side_effect=lambda x: x)
-    GHTP._replace_back_ticks = MagicMock(side_effect=lambda x: x)
-    GHTP._add_double_quotes = MagicMock(side_effect=lambda x: x)
-    GHTP._increment_array_indexes = MagicMock(side_effect=lambda x: x)
-    GHTP._cast_divisions_to_double = MagicMock(side_effect=lambda x: x)
-    GHTP._fix_rlike_calls = MagicMock(side_effect=lambda x: x)
-    GHTP._fix_lateral_view_explode_calls = MagicMock(side_effect=lambda x: x)
-    GHTP._fix_interval_formatting = MagicMock(side_effect=lambda x: x)
-    GHTP._fix_aliasing_on_broadcasting = MagicMock(side_effect=lambda x: x)
-    GHTP.gbt.fix_group_by_calls = MagicMock(side_effect=lambda x: x)
+    for name in (
+        "_remove_dollar_sign", "_replace_double_quotes", "_replace_back_ticks", "_add_double_quotes", "_increment_array_indexes",
+        "_cast_divisions_to_double", "_fix_rlike_calls", "_fix_lateral_view_explode_calls", "_fix_interval_formatting",
+        "_fix_aliasing_on_broadcasting"
+    ):
+        setattr(GHTP, name, _identity)  # Plain function on the instance: no MagicMock call bookkeeping
+    GHTP.gbt.fix_group_by_calls = _identity
     assert GHTP.translate_query("select * from db.table") == "select * from db.table"
 
 
@@ -34,18 +42,16 @@ def test_translate_query(mock_protect_regex_curly_brackets: MagicMock) -> None:
     ('select "a" from b', "select 'a' from b"),  # Would be surrounded ``
     ('RIGHT JOIN db.table b', 'RIGHT JOIN db.table b')
 ])
-def test_replace_double_quotes(query: str, expected: str) -> None:
-    GHTP = global_translation.GlobalHiveToPresto()
-    assert GHTP._replace_double_quotes(query) == expected
+def test_replace_double_quotes(ghtp: global_translation.GlobalHiveToPresto, query: str, expected: str) -> None:
+    assert ghtp._replace_double_quotes(query) == expected
 
 
 @pytest.mark.parametrize(['query', 'expected'], [
     ("", ""),
     ('select `a b` from b', 'select "a b" from b')
 ])
-def test_replace_back_ticks(query: str, expected: str) -> None:
-    GHTP = global_translation.GlobalHiveToPresto()
-    assert GHTP._replace_back_ticks(query) == expected
+def test_replace_back_ticks(ghtp: global_translation.GlobalHiveToPresto, query: str, expected: str) -> None:
+    assert ghtp._replace_back_ticks(query) == expected
 
 
 @pytest.mark.parametrize(['query', 'expected'], [
@@ -56,9 +62,8 @@ def test_replace_back_ticks(query: str, expected: str) -> None:
     ("select case when coalesce(sth_123_bal, 0) > 0 then 1 else 0 end as 123_flag from cte",
      'select case when coalesce(sth_123_bal, 0) > 0 then 1 else 0 end as "123_flag" from cte')
 ])
-def test_add_double_quotes(query: str, expected: str) -> None:
-    GHTP = global_translation.GlobalHiveToPresto()
-    assert GHTP._add_double_quotes(query) == expected
+def test_add_double_quotes(ghtp: global_translation.GlobalHiveToPresto, query: str, expected: str) -> None:
+    assert ghtp._add_double_quotes(query) == expected
 
 
 @pytest.mark.parametrize(['query', 'expected'], [
@@ -66,9 +71,8 @@ def test_add_double_quotes(query: str, expected: str) -> None:
     ('select ab from ${b}', 'select ab from {b}'),
     ('select regex_like(a, "abc$") from b', 'select regex_like(a, "abc$") from b')
 ])
-def test_remove_dollar_sign(query: str, expected: str) -> None:
-    GHTP = global_translation.GlobalHiveToPresto()
-    assert GHTP._remove_dollar_sign(query) == expected
+def test_remove_dollar_sign(ghtp: global_translation.GlobalHiveToPresto, query: str, expected: str) -> None:
+    assert ghtp._remove_dollar_sign(query) == expected
 
 
 @pytest.mark.parametrize(['query', 'expected'], [
@@ -76,9 +80,8 @@ def test_remove_dollar_sign(query: str, expected: str) -> None:
     ("select split(a, '_')[1], split(b, '_')[0] from c", "select split(a, '_')[2], split(b, '_')[1] from c"),
     ("select a from b", "select a from b")
 ])
-def test_increment_array_indexes(query: str, expected: str) -> None:
-    GHTP = global_translation.GlobalHiveToPresto()
-    assert GHTP._increment_array_indexes(query) == expected
+def test_increment_array_indexes(ghtp: global_translation.GlobalHiveToPresto, query: str, expected: str) -> None:
+    assert ghtp._increment_array_indexes(query) == expected
 
 
 @pytest.mark.parametrize(['query', 'expected'], [
@@ -86,47 +89,55 @@ def test_increment_array_indexes(query: str, expected: str) -> None:
     ("select a/2", "select cast(a AS double)/cast(2 AS double)"),
     ("select count(a/2)/3", "select cast(count(cast(a AS double)/cast(2 AS double)) AS double)/cast(3 AS double)")
 ])
-def test_cast_divisions_to_double(query: str, expected: str) -> None:
-    GHTP = global_translation.GlobalHiveToPresto()
-    assert GHTP._cast_divisions_to_double(query) == expected
+def test_cast_divisions_to_double(ghtp: global_translation.GlobalHiveToPresto, query: str, expected: str) -> None:
+    assert ghtp._cast_divisions_to_double(query) == expected
 
 
 @pytest.mark.parametrize(['query', 'expected'], [
     ("select a rlike\nb", "select a like\nb"),
     ("select 1", "select 1")
 ])
-def test_fix_rlike_calls(query: str, expected: str) -> None:
-    GHTP = global_translation.GlobalHiveToPresto()
-    assert GHTP._fix_rlike_calls(query) == expected
+def test_fix_rlike_calls(ghtp: global_translation.GlobalHiveToPresto, query: str, expected: str) -> None:
+    assert ghtp._fix_rlike_calls(query) == expected
 
 
 @pytest.mark.parametrize(['query', 'expected'], [
     ("""select a from cte where LATERAL VIEW EXPLODE(split(b, ',')) "7day" AS score""",
      f"""select a from cte where CROSS JOIN unnest(split(b, ',')) AS "7day" {utils.function_placeholder}(score)"""),
+    ("select a from cte LATERAL VIEW EXPLODE(split(regexp_replace(b, 'x', 'y'), ',')) t AS score",
+     f"select a from cte CROSS JOIN unnest(split(regexp_replace(b, 'x', 'y'), ',')) AS t {utils.function_placeholder}(score)"),  # Nested
+    ("select a from cte LATERAL VIEW EXPLODE(split(regexp_replace(lower(b), 'x', 'y'), ',')) t AS score",
+     f"select a from cte CROSS JOIN unnest(split(regexp_replace(lower(b), 'x', 'y'), ',')) AS t {utils.function_placeholder}(score)"),  # 3 levels
+    ("select a from cte LATERAL VIEW EXPLODE(split(b, '(')) t AS score",
+     f"select a from cte CROSS JOIN unnest(split(b, '(')) AS t {utils.function_placeholder}(score)"),  # Parenthesis in a literal
+    ("select a from cte LATERAL VIEW EXPLODE(split(b, '\\'')) t AS score",
+     f"select a from cte CROSS JOIN unnest(split(b, '\\'')) AS t {utils.function_placeholder}(score)"),  # Escaped quote in a literal
+    ("select a from cte LATERAL VIEW explode(a) t1 AS x LATERAL VIEW explode(b) t2 AS y",
+     f"select a from cte CROSS JOIN unnest(a) AS t1 {utils.function_placeholder}(x) CROSS JOIN unnest(b) AS t2 {utils.function_placeholder}(y)"),
+    pytest.param("select a from cte lateral view explode(" + "(" * 10000, "select a from cte lateral view explode(" + "(" * 10000, id="adversarial"),
     ("select 1", "select 1")
 ])
-def test_fix_lateral_view_explode_calls(query: str, expected: str) -> None:
-    GHTP = global_translation.GlobalHiveToPresto()
-    assert GHTP._fix_lateral_view_explode_calls(query) == expected
+def test_fix_lateral_view_explode_calls(ghtp: global_translation.GlobalHiveToPresto, query: str, expected: str) -> None:
+    assert ghtp._fix_lateral_view_explode_calls(query) == expected
 
 
 @pytest.mark.parametrize(['query', 'expected'], [
     ("select 1==1", "select 1=1"),
     ("select 1", "select 1")
 ])
-def test_fix_double_equals(query: str, expected: str) -> None:
-    GHTP = global_translation.GlobalHiveToPresto()
-    assert GHTP._fix_double_equals(query) == expected
+def test_fix_double_equals(ghtp: global_translation.GlobalHiveToPresto, query: str, expected: str) -> None:
+    assert ghtp._fix_double_equals(query) == expected
 
 
 @pytest.mark.parametrize(['query', 'expected'], [
     ("select a from cte where a BETWEEN (CURRENT_DATE - interval '1' as YEAR) AND CURRENT_DATE",
      "select a from cte where a BETWEEN (CURRENT_DATE - interval '1' YEAR) AND CURRENT_DATE"),
+    ("select interval '1' day, 'a' as b from cte", "select interval '1' day, 'a' as b from cte"),  # Must not reach the next quote
+    pytest.param("select interval '" + "a " * 10000, "select interval '" + "a " * 10000, id="adversarial"),
     ("select 1", "select 1")
 ])
-def test_fix_interval_formatting(query: str, expected: str) -> None:
-    GHTP = global_translation.GlobalHiveToPresto()
-    assert GHTP._fix_interval_formatting(query) == expected
+def test_fix_interval_formatting(ghtp: global_translation.GlobalHiveToPresto, query: str, expected: str) -> None:
+    assert ghtp._fix_interval_formatting(query) == expected
 
 
 @pytest.mark.parametrize(['query', 'expected'], [
@@ -157,9 +168,8 @@ def test_fix_interval_formatting(query: str, expected: str) -> None:
     ("select 1.5 from cte group by 1.5 sth", "select 1.5 from cte group by 1.5 as sth"),
     ("select '1', 1, 1.5 from cte group by '1' a, 1 b, 1.5 c", "select '1', 1, 1.5 from cte group by '1' as a, 1 as b, 1.5 as c"),
 ])
-def test__fix_aliasing_on_broadcasting(query: str, expected: str) -> None:
-    GHTP = global_translation.GlobalHiveToPresto()
-    assert GHTP._fix_aliasing_on_broadcasting(query) == expected
+def test__fix_aliasing_on_broadcasting(ghtp: global_translation.GlobalHiveToPresto, query: str, expected: str) -> None:
+    assert ghtp._fix_aliasing_on_broadcasting(query) == expected
 
 
 @pytest.mark.parametrize(['query_section', 'expected'], [
@@ -199,9 +209,8 @@ from z a
 left join zz b 
 on a.zzz=b.zzz""")
 ])
-def test_move_insert_statement(query_section: str, expected: str) -> None:
-    GHTP = global_translation.GlobalHiveToPresto()
-    assert GHTP.move_insert_statement(query_section) == expected
+def test_move_insert_statement(ghtp: global_translation.GlobalHiveToPresto, query_section: str, expected: str) -> None:
+    assert ghtp.move_insert_statement(query_section) == expected
 
 
 @pytest.mark.parametrize(['query', 'expected'], [
@@ -272,9 +281,8 @@ def test_move_insert_statement(query_section: str, expected: str) -> None:
     # Fails, but do nothing with it
     ("select a, b from db.table group by c", "select a, b from db.table group by c")
 ])
-def test_fix_group_by_calls(query: str, expected: str) -> None:
-    GBT = global_translation.GroupByTranslator()
-    assert GBT.fix_group_by_calls(query) == expected
+def test_fix_group_by_calls(gbt: global_translation.GroupByTranslator, query: str, expected: str) -> None:
+    assert gbt.fix_group_by_calls(query) == expected
 
 
 @pytest.mark.parametrize(['query'], [
@@ -285,10 +293,9 @@ def test_fix_group_by_calls(query: str, expected: str) -> None:
     ("select a from cte group by having a=3",),
     ("group by having a=3",)
 ])
-def test_fix_group_by_calls_SyntaxError(query: str) -> None:
-    GBT = global_translation.GroupByTranslator()
+def test_fix_group_by_calls_SyntaxError(gbt: global_translation.GroupByTranslator, query: str) -> None:
     with pytest.raises(SyntaxError):
-        GBT.fix_group_by_calls(query)
+        gbt.fix_group_by_calls(query)
 
 
 @pytest.mark.parametrize(['query', 'expected'], [
@@ -317,19 +324,17 @@ def test_fix_group_by_calls_SyntaxError(query: str) -> None:
     ("select a from cte1 group by a union select b from cte2 group by", [({"b"}, None)]),
     ("select a from cte1 group by a union all select b, c from cte2 group by", [({"b"}, None), ({"c"}, None)])
 ])
-def test_get_columns_in_select(query: str, expected: Optional[List[Tuple[str, Optional[str]]]]) -> None:
-    GBT = global_translation.GroupByTranslator()
-    assert GBT.get_columns_in_select(sqlparse.parse(query)[0].tokens[-1]) == expected
+def test_get_columns_in_select(gbt: global_translation.GroupByTranslator, query: str, expected: Optional[List[Tuple[str, Optional[str]]]]) -> None:
+    assert gbt.get_columns_in_select(sqlparse.parse(query)[0].tokens[-1]) == expected
 
 
 @pytest.mark.parametrize(['query'], [
     ("select from cte group by sth group by",),
     ("select group by",)
 ])
-def test_get_columns_in_select_SyntaxError(query: str) -> None:
-    GBT = global_translation.GroupByTranslator()
+def test_get_columns_in_select_SyntaxError(gbt: global_translation.GroupByTranslator, query: str) -> None:
     with pytest.raises(SyntaxError):
-        GBT.get_columns_in_select(sqlparse.parse(query)[0].tokens[-1])
+        gbt.get_columns_in_select(sqlparse.parse(query)[0].tokens[-1])
 
 
 @pytest.mark.parametrize(['string_rep_integer', "expected"], [
@@ -342,6 +347,5 @@ def test_get_columns_in_select_SyntaxError(query: str) -> None:
     ("2147483648", "bigint"),
     ("-2147483649", "bigint")
 ])
-def test_least_integer_data_type(string_rep_integer: str, expected: str) -> None:
-    GBT = global_translation.GroupByTranslator()
-    assert GBT.least_integer_data_type(string_rep_integer) == expected
+def test_least_integer_data_type(gbt: global_translation.GroupByTranslator, string_rep_integer: str, expected: str) -> None:
+    assert gbt.least_integer_data_type(string_rep_integer) == expected
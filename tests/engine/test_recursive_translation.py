@@ -1,13 +1,26 @@
 from unittest.mock import MagicMock
+import functools
 import pytest
 import os
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Type
 import sqlparse
 from sqlparse.tokens import Name, Literal
 from sql_translate.engine import recursive_translation
 from sql_translate import utils
 
-Translation = recursive_translation.RecursiveHiveToPresto()
+
+@pytest.fixture(scope="module")
+def translator() -> recursive_translation.RecursiveHiveToPresto:
+    return recursive_translation.RecursiveHiveToPresto()  # Read-only use: a single instance is shared by the module
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse(sql: str) -> Tuple[sqlparse.sql.Statement, ...]:
+    return sqlparse.parse(sql)  # The translator only reads tokens, so parsed statements can be shared between test cases
+
+
+def _fn(sql: str) -> List[sqlparse.sql.Token]:
+    return _parse(sql)[0].tokens[0].tokens  # Tokens of the single function in the statement
 
 
 def test_create_parent() -> None:
@@ -25,33 +38,19 @@ def test_translate_query(query: str, has_insert_statement: bool, expected: Dict)
     assert Translation.partition_info == expected
 
 
-def test_translate_query_ValueError() -> None:
-    Translation = recursive_translation.RecursiveHiveToPresto()
+def test_translate_query_ValueError(translator: recursive_translation.RecursiveHiveToPresto) -> None:
     with pytest.raises(ValueError):
-        Translation.translate_query("INSERT INTO TABLE test_db.test_table select * from db1.table1;select * from db2.table2")
+        translator.translate_query("INSERT INTO TABLE test_db.test_table select * from db1.table1;select * from db2.table2")
 
 
-@pytest.mark.parametrize(['query'], [
-    ("()",),
-    ("(a)",),
-    ("(a, b, c)",)
+@pytest.mark.parametrize(['query', 'expected'], [
+    ("()", []),
+    ("(a)", ["a"]),
+    ("(a, b, c)", ["a", ",", " ", "b", ",", " ", "c"])  # IdentifierList is flattened
 ])
-def test_breakdown_parenthesis(query: str) -> None:
-    Translation = recursive_translation.RecursiveHiveToPresto()
-    tokens = sqlparse.parse(query)[0][0]
-    expected = query.strip("()")
-    if expected == "":
-        expected = []
-    else:
-        expected = sqlparse.parse(expected)[0][0].tokens
-    result = Translation._breakdown_parenthesis(tokens)
-
-    # Validation
-    assert len(result) == len(expected)
-    assert all([
-        result[idx].value == expected[idx].value
-        for idx in range(len(result))
-    ])
+def test_breakdown_parenthesis(translator: recursive_translation.RecursiveHiveToPresto, query: str, expected: List[str]) -> None:
+    result = translator._breakdown_parenthesis(_parse(query)[0][0])
+    assert [t.value for t in result] == expected
 
 
 @pytest.mark.parametrize(['statement', 'translation', 'output_type'], [
@@ -95,12 +94,9 @@ def test_breakdown_parenthesis(query: str) -> None:
     ("unnest(split(cast(a AS varchar), ','))", "unnest(split(cast(a AS varchar), ','))", "any")
     # Test divisions casted to double
     # ("count(a/2)", "count(cast(a AS double)/cast(2 AS double))", "bigint")
-])
-def test_translate_function_regular(statement: str, translation: str, output_type: str) -> None:
-    Translation = recursive_translation.RecursiveHiveToPresto()
-    query = sqlparse.parse(statement)[0]  # Single query in this statement
-    function = query.tokens[0]  # Single object in query
-    assert Translation._translate_function(function.tokens) == (translation, output_type)   # We know it's a single query in this statement
+], ids=["lag_newline", "lag", "concat_distinct", "concat_timestamp", "concat_upper", "concat_nested", "concat_ws", "date", "date_array_index", "array_contains_concat", "split", "from_unixtime", "current_date", "current_timestamp", "timestamp", "year", "month", "day", "add_months", "regexp_extract", "datediff", "date_add", "date_sub", "max", "min", "if", "if_boolean_operator", "if_operation", "if_comparison", "unnest_split"])
+def test_translate_function_regular(translator: recursive_translation.RecursiveHiveToPresto, statement: str, translation: str, output_type: str) -> None:
+    assert translator._translate_function(_fn(statement)) == (translation, output_type)
 
 
 @pytest.mark.parametrize(['statement', 'translation', 'output_type'], [
@@ -120,9 +116,6 @@ def test_translate_function_regular(statement: str, translation: str, output_typ
     ("count(a)", "count(a)", "bigint"),
     ("count(distinct a, b)", "count(distinct cast(a AS varchar)|| ' ' ||cast(b AS varchar))", "bigint"),
     ("array(1, 2, 3)", "array[1, 2, 3]", "array"),
-    ("date_format(timestamp('2020-03-25 16:32:01'), 'yyyy-MM-dd')", "date_format(cast('2020-03-25 16:32:01' AS timestamp), '%Y-%m-%d')", "varchar"),
-    ("date_format(timestamp('2020-Jun-25 16:32:01'), 'yyyy-MMM-dd')", "date_format(cast('2020-Jun-25 16:32:01' AS timestamp), '%Y-%b-%d')", "varchar"),
-    ("date_format(timestamp('2020-June-25 16:32:01'), 'yyyy-MMMM-dd')", "date_format(cast('2020-June-25 16:32:01' AS timestamp), '%Y-%M-%d')", "varchar"),
     ("format_number(3.1415, 2)", "cast(cast(round(3.1415, 2) AS double) AS varchar)", "varchar"),
     ("format_number(1234.5, '00000')", "lpad(cast(round(1234.5) AS varchar), 5, '0')", "varchar"),  # left padding with 0 if there are enough of them
     ("from_utc_timestamp(a, 'PST')", "cast(cast(cast(a AS timestamp) as timestamp) AT TIME ZONE 'America/Los_Angeles' AS timestamp)", "timestamp"),
@@ -133,70 +126,40 @@ def test_translate_function_regular(statement: str, translation: str, output_typ
     ("isnotnull(1)", "1 is not null", "boolean"),
     ("zzz_test_no_args_hive()", "zzz_test_no_args_presto()", "any"),
     ("date_format('2020-03-25 16:32:01', 'u')", "case when day_of_week(cast('2020-03-25 16:32:01' AS timestamp)) = 7 then 1 else day_of_week(cast('2020-03-25 16:32:01' AS timestamp)) + 1 end", "varchar"),
-    ("extract(day from '2020-03-25 16:32:01')", "extract(day from cast('2020-03-25 16:32:01' AS timestamp))", "bigint"),
-    ("extract(dayofweek from '2020-03-25 16:32:01')", "case when extract(day_of_week from cast('2020-03-25 16:32:01' AS timestamp)) = 7 then 1 else extract(day_of_week from cast('2020-03-25 16:32:01' AS timestamp)) + 1 end", "bigint"),
-    ("extract(hour from '2020-03-25 16:32:01')", "extract(hour from cast('2020-03-25 16:32:01' AS timestamp))", "bigint"),
-    ("extract(minute from '2020-03-25 16:32:01')", "extract(minute from cast('2020-03-25 16:32:01' AS timestamp))", "bigint"),
-    ("extract(month from '2020-03-25 16:32:01')", "extract(month from cast('2020-03-25 16:32:01' AS timestamp))", "bigint"),
-    ("extract(quarter from '2020-03-25 16:32:01')", "extract(quarter from cast('2020-03-25 16:32:01' AS timestamp))", "bigint"),
-    ("extract(second from '2020-03-25 16:32:01')", "extract(second from cast('2020-03-25 16:32:01' AS timestamp))", "bigint"),
-    ("extract(week from '2020-03-25 16:32:01')", "extract(week from cast('2020-03-25 16:32:01' AS timestamp))", "bigint"),
-    ("extract(year from '2020-03-25 16:32:01')", "extract(year from cast('2020-03-25 16:32:01' AS timestamp))", "bigint")
-])
-def test_translate_function_specials(statement: str, translation: str, output_type: str) -> None:
-    Translation = recursive_translation.RecursiveHiveToPresto()
-    query = sqlparse.parse(statement)[0]  # Single query in this statement
-    function = query.tokens[0]  # Single object in query
-    assert Translation._translate_function(function.tokens) == (translation, output_type)   # Single query in this statement
-
-
-@pytest.mark.parametrize(['statement'], [
-    ("date_format(timestamp('AD 2020-03-25 16:32:01'), 'G yyyy-MM-dd')",),
-    ("abcdef(1, 2, 3)",),
-    ("zzz_test_not_yet_implemented(1, 2, 3)",),
-    ("format_number(1234.5, '0001')",),
-    ("format_number(a, b)",)
-])
-def test_translate_function_NotImplementedError(statement: str) -> None:
-    Translation = recursive_translation.RecursiveHiveToPresto()
-    query = sqlparse.parse(statement)[0]  # Single query in this statement
-    function = query.tokens[0]  # Single object in query
-    with pytest.raises(NotImplementedError):
-        Translation._translate_function(function.tokens)
+    ("extract(dayofweek from '2020-03-25 16:32:01')", "case when extract(day_of_week from cast('2020-03-25 16:32:01' AS timestamp)) = 7 then 1 else extract(day_of_week from cast('2020-03-25 16:32:01' AS timestamp)) + 1 end", "bigint")
+], ids=["cast_varchar", "cast_string", "cast_decimal", "cast_contains", "cast_over", "cast_over_partition", "cast_over_order", "cast_over_nested", "cast_date_add", "count", "count_distinct", "array", "format_number_decimals", "format_number_padding", "from_utc_timestamp", "unix_timestamp_now", "unix_timestamp", "unix_timestamp_format", "isnull", "isnotnull", "no_args", "date_format_day_of_week", "extract_dayofweek"])
+def test_translate_function_specials(translator: recursive_translation.RecursiveHiveToPresto, statement: str, translation: str, output_type: str) -> None:
+    assert translator._translate_function(_fn(statement)) == (translation, output_type)
 
 
-@pytest.mark.parametrize(['statement'], [
-    ("date_format(timestamp('2020-June-25 16:32:01'), 'yyyy-EEE-dd')",)
-])
-def test_translate_function_KeyError(statement: str) -> None:
-    Translation = recursive_translation.RecursiveHiveToPresto()
-    query = sqlparse.parse(statement)[0]  # Single query in this statement
-    function = query.tokens[0]  # Single object in query
-    with pytest.raises(KeyError):
-        Translation._translate_function(function.tokens)
+@pytest.mark.parametrize('part', ["day", "hour", "minute", "month", "quarter", "second", "week", "year"])
+def test_translate_function_extract(translator: recursive_translation.RecursiveHiveToPresto, part: str) -> None:
+    assert translator._translate_function(_fn(f"extract({part} from '2020-03-25 16:32:01')")) == (f"extract({part} from cast('2020-03-25 16:32:01' AS timestamp))", "bigint")
 
 
-@pytest.mark.parametrize('statement', [
-    ("array_contains(a)"),
-    ("array_contains()")
+@pytest.mark.parametrize(['month', 'hive_format', 'presto_format'], [
+    ("03", "MM", "%m"),
+    ("Jun", "MMM", "%b"),
+    ("June", "MMMM", "%M")
 ])
-def test_translate_function_IndexError(statement: str) -> None:
-    Translation = recursive_translation.RecursiveHiveToPresto()
-    query = sqlparse.parse(statement)[0]  # Single query in this statement
-    function = query.tokens[0]  # Single object in query
-    with pytest.raises(IndexError):
-        Translation._translate_function(function.tokens)
-
-
-@pytest.mark.parametrize('statement', [
-    ("lag(a, '3.5', c)")
+def test_translate_function_date_format(translator: recursive_translation.RecursiveHiveToPresto, month: str, hive_format: str, presto_format: str) -> None:
+    assert translator._translate_function(_fn(f"date_format(timestamp('2020-{month}-25 16:32:01'), 'yyyy-{hive_format}-dd')")) == (f"date_format(cast('2020-{month}-25 16:32:01' AS timestamp), '%Y-{presto_format}-%d')", "varchar")
+
+
+@pytest.mark.parametrize(['statement', 'exception'], [
+    ("date_format(timestamp('AD 2020-03-25 16:32:01'), 'G yyyy-MM-dd')", NotImplementedError),
+    ("abcdef(1, 2, 3)", NotImplementedError),
+    ("zzz_test_not_yet_implemented(1, 2, 3)", NotImplementedError),
+    ("format_number(1234.5, '0001')", NotImplementedError),
+    ("format_number(a, b)", NotImplementedError),
+    ("date_format(timestamp('2020-June-25 16:32:01'), 'yyyy-EEE-dd')", KeyError),
+    ("array_contains(a)", IndexError),
+    ("array_contains()", IndexError),
+    ("lag(a, '3.5', c)", ValueError)
 ])
-def test_translate_function_ValueError(statement: str) -> None:
-    Translation = recursive_translation.RecursiveHiveToPresto()
-    query = sqlparse.parse(statement)[0]  # Single query in this statement
-    function = query.tokens[0]  # Single object in query
-    with pytest.raises(ValueError):
-        Translation._translate_function(function.tokens)
+def test_translate_function_errors(translator: recursive_translation.RecursiveHiveToPresto, statement: str, exception: Type[Exception]) -> None:
+    with pytest.raises(exception):
+        translator._translate_function(_fn(statement))
 
 
 @pytest.mark.parametrize(['statement', 'expected'], [
@@ -204,14 +167,14 @@ def test_translate_function_ValueError(statement: str) -> None:
     ("INSERT INTO TABLE test_db.test_table select * from a where b='c'", "INSERT INTO TABLE test_db.test_table select * from a where b='c'"),
     ("INSERT INTO TABLE test_db.test_table select case when a then b end AS c from d", "INSERT INTO TABLE test_db.test_table select case when a then b end AS c from d"),
     ("INSERT INTO TABLE test_db.test_table select concat(a1)-concat(a2) from a", "INSERT INTO TABLE test_db.test_table select concat(cast(a1 AS varchar))-concat(cast(a2 AS varchar)) from a"),
-    ("""INSERT INTO TABLE test_db.test_table partition
+    pytest.param("""INSERT INTO TABLE test_db.test_table partition
     select concat((9 - cast(substring(format_number(cast(a.my_column as bigint), '0000000000'),9,1) as bigint)),
     (9 - cast(substring(format_number(cast(a.my_column as bigint), '0000000000'),10,1) as bigint)))
     FROM cte""",
      """INSERT INTO TABLE test_db.test_table partition
     select concat(cast((9 - cast(substr(lpad(cast(round(cast(a.my_column AS bigint)) AS varchar), 10, '0'), 9, 1) AS bigint)) AS varchar), cast((9 - cast(substr(lpad(cast(round(cast(a.my_column AS bigint)) AS varchar), 10, '0'), 10, 1) AS bigint)) AS varchar))
-    FROM cte"""),
-    ("""
+    FROM cte""", marks=pytest.mark.slow),
+    pytest.param("""
     with a AS (
         select case when array_contains(a, '2') then '4' else '3' end from b
     ),
@@ -232,17 +195,16 @@ def test_translate_function_ValueError(statement: str) -> None:
     INSERT INTO TABLE test_db.test_table
     select *
     from c
-    """),
+    """, marks=pytest.mark.slow),
     # Test divisions casted to double
     ("INSERT INTO TABLE test_db.test_table select 1+1", "INSERT INTO TABLE test_db.test_table select 1+1"),
     # Test array breakdown
     ("INSERT INTO TABLE test_db.test_table select 1, array('-1') as my_col, abc from cte", "INSERT INTO TABLE test_db.test_table select 1, array['-1'] as my_col, abc from cte")
-])
-def test_breakdown_query(statement: str, expected: str) -> None:
-    Translation = recursive_translation.RecursiveHiveToPresto()
-    query = sqlparse.parse(statement)[0]  # Single query in this statement
-    _, _, _, Translation.partition_info = utils.parse_hive_insertion(query.value)  # Set the partition information
-    assert Translation._breakdown_query(query.tokens) == expected
+], ids=["insert_partition_simple", "insert_plain", "case_when", "concat_minus", "format_number_nested", "cte_with_between", "arithmetic_noop", "array_literal"])
+def test_breakdown_query(translator: recursive_translation.RecursiveHiveToPresto, statement: str, expected: str) -> None:
+    query = _parse(statement)[0]  # Single query in this statement
+    _, _, _, translator.partition_info = utils.parse_hive_insertion(query.value)  # Set the partition information
+    assert translator._breakdown_query(query.tokens) == expected
 
 
 @pytest.mark.parametrize(['str_output_arguments', 'compositions', 'expected'], [
@@ -250,11 +212,25 @@ def test_breakdown_query(statement: str, expected: str) -> None:
     (["1", "2"], [{"formula": "-{arg}", "args": "all", "as_group": True}], ["-1, 2"]),  # Apply as a group, returns [str]
     (["1", "2"], [{"formula": "-{arg}", "args": [1]}], ["1", "-2"]),  # Apply to one element
     (["1", "2"], [{"formula": "-{arg}", "args": [1], "as_group": True}], ["1", "-2"]),  # No effect on single arg
-    (["1", "2"], [{"formula": "-{arg}", "args": [1], "as_group": True}], ["1", "-2"])  # No effect on single arg
+    (["1", "2"], [{"formula": "-{arg}", "args": [1], "merged": True}], ["1", "-2"]),  # No effect on single arg
+    (["1", "2", "3"], [{"formula": "-{arg}", "args": [0, 1], "as_group": True}], ["-1, 2", "3"]),
+    (["1", "2", "3"], [{"formula": "-{arg}", "args": [0, 1], "merged": True}], ["-1 2", "3"])
 ])
 def test_apply_compositions(str_output_arguments: List, compositions: List[Dict], expected: List) -> None:
-    Translation = recursive_translation.RecursiveHiveToPresto()
-    Translation._apply_compositions(str_output_arguments, compositions) == expected
+    assert recursive_translation.RecursiveHiveToPresto._apply_compositions(str_output_arguments, compositions) == expected  # No instance needed
+
+
+def test_apply_compositions_end() -> None:
+    compositions = [{"formula": "-{arg}", "args": [1, "end"]}]
+    assert recursive_translation.RecursiveHiveToPresto._apply_compositions(["1", "2"], compositions) == ["1", "-2"]
+    assert recursive_translation.RecursiveHiveToPresto._apply_compositions(["1", "2", "3"], compositions) == ["1", "-2", "-3"]
+    assert compositions == [{"formula": "-{arg}", "args": [1, "end"]}]  # "end" is expanded on a copy
+
+
+def test_functions_shared(translator: recursive_translation.RecursiveHiveToPresto) -> None:
+    assert recursive_translation.RecursiveHiveToPresto().functions is translator.functions
+    with pytest.raises(TypeError):
+        translator.functions["abc"] = {}  # Read-only
 
 
 @pytest.mark.parametrize(['str_output_arguments', 'compositions'], [
@@ -265,6 +241,5 @@ def test_apply_compositions(str_output_arguments: List, compositions: List[Dict]
     (["1", "2"], [{"formula": "{arg}", "args": [0, 2]}])  # Not continuous
 ])
 def test_apply_compositions_AssertionError(str_output_arguments: List, compositions: List[Dict]) -> None:
-    Translation = recursive_translation.RecursiveHiveToPresto()
     with pytest.raises(AssertionError):
-        Translation._apply_compositions(str_output_arguments, compositions)
+        recursive_translation.RecursiveHiveToPresto._apply_compositions(str_output_arguments, compositions)
@@ -1,4 +1,3 @@
-import unittest
 import pytest
 from typing import Union
 import re
@@ -12,9 +11,11 @@ def test_unexpected_behavior() -> None:
 @pytest.mark.parametrize(['pattern', 'string', 'strict', 'case_sensitive', 'expected'], [
     (r"h.", "Hello world!", True, False, "He"),
     (r"h.", "Hello world!", False, True, None),
-    (r"H", "Hello world!", True, True, "H")
+    (r"H", "Hello world!", True, True, "H"),
+    (re.compile(r"h.", flags=re.IGNORECASE), "Hello world!", True, True, "He"),  # Precompiled flags take precedence
+    (re.compile(r"a"), "Hello world!", False, False, None)
 ])
-def test_search(pattern: str, string: str, strict: bool, case_sensitive: bool, expected: str) -> None:
+def test_search(pattern: Union[str, re.Pattern], string: str, strict: bool, case_sensitive: bool, expected: str) -> None:
     Regex = regex.Regex()
     output = Regex.search(pattern, string, strict=strict, case_sensitive=case_sensitive)
     if output:
@@ -23,6 +24,16 @@ def test_search(pattern: str, string: str, strict: bool, case_sensitive: bool, e
         assert output == expected
 
 
+def test_compile_cache() -> None:
+    Regex = regex.Regex()
+    regex._compile.cache_clear()
+    Regex.search(r"h.", "Hello world!")
+    Regex.sub(r"h.", "", "Hello world!")  # Same pattern & flags: reuses the compiled pattern
+    Regex.search(r"h.", "Hello world!", case_sensitive=True, strict=False)  # Different flags: compiled separately
+    assert regex._compile.cache_info().hits == 1
+    assert regex._compile.cache_info().misses == 2
+
+
 def test_search_Exception() -> None:
     Regex = regex.Regex()
     with pytest.raises(Exception):
@@ -32,9 +43,11 @@ def test_search_Exception() -> None:
 @pytest.mark.parametrize(['pattern', 'repl', 'string', 'strict', 'case_sensitive', 'expected'], [
     (r"WORLD", "you", "Hello WORLD!", True, True, "Hello you!"),
     (r"a", "you", "Hello world!", False, False, "Hello world!"),
-    (r"\[(\d+)\]", lambda match: f"[{int(match.group(1))+1}]", "array[1]", True, False, "array[2]")
+    (r"\[(\d+)\]", lambda match: f"[{int(match.group(1))+1}]", "array[1]", True, False, "array[2]"),
+    (re.compile(r"world"), "you", "Hello WORLD!", False, False, "Hello WORLD!"),  # Precompiled flags take precedence
+    (re.compile(r"world", flags=re.IGNORECASE), "you", "Hello WORLD!", True, True, "Hello you!")
 ])
-def test_sub(pattern: str, repl: Union[str, callable], string: str, strict: bool, case_sensitive: bool, expected: str) -> None:
+def test_sub(pattern: Union[str, re.Pattern], repl: Union[str, callable], string: str, strict: bool, case_sensitive: bool, expected: str) -> None:
     Regex = regex.Regex()
     assert Regex.sub(pattern, repl, string, strict=strict, case_sensitive=case_sensitive) == expected
 
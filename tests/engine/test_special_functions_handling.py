@@ -4,6 +4,11 @@ import pytest
 _SpecialFunctionHandler = special_functions_handling._SpecialFunctionHandler()
 
 
+@pytest.fixture(scope="module")
+def handler() -> special_functions_handling.SpecialFunctionHandlerHiveToPresto:
+    return special_functions_handling.SpecialFunctionHandlerHiveToPresto()
+
+
 @pytest.mark.parametrize(['datetime_format', 'expected'], [
     ('yyyy-MM-dd HH:mm:ss', '%Y-%m-%d %k:%i:%s'),
     ('yyyy-MM-dd', '%Y-%m-%d'),
@@ -13,6 +18,5 @@ _SpecialFunctionHandler = special_functions_handling._SpecialFunctionHandler()
     ('yMdd', '%Y%c%d'),
     ('y-MM-01', '%Y-%m-01')
 ])
-def test_translate_datetime_format(datetime_format: str, expected: str) -> None:
-    SpecialFunctionHandlerHiveToPresto = special_functions_handling.SpecialFunctionHandlerHiveToPresto()
-    assert SpecialFunctionHandlerHiveToPresto._translate_datetime_format(datetime_format) == expected
+def test_translate_datetime_format(handler: special_functions_handling.SpecialFunctionHandlerHiveToPresto, datetime_format: str, expected: str) -> None:
+    assert handler._translate_datetime_format(datetime_format) == expected
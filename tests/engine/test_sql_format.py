@@ -1,12 +1,17 @@
-from typing import Dict
 import os
-import unittest
+import pathlib
 import pytest
 from sql_translate.engine import sql_format
 
 Formatter = sql_format.Formatter()
 
 
+@pytest.fixture(scope="session")
+def file_to_format() -> str:
+    with open(os.path.join(os.path.dirname(__file__), "..", "samples", "sql_format", "file_to_format.sql")) as f:
+        return f.read()  # Read once for the whole session
+
+
 @pytest.mark.parametrize(['query', 'expected'], [
     (
         "",
@@ -21,9 +26,11 @@ def test_format_query(query: str, expected: str) -> None:
     assert Formatter.format_query(query) == expected
 
 
-def test_format_file() -> None:
-    path = os.path.join(os.path.dirname(__file__), "..", "samples", "sql_format", "file_to_format.sql")
-    path_formatted_file = Formatter.format_file(path)
+@pytest.mark.slow
+def test_format_file(file_to_format: str, tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "file_to_format.sql"
+    path.write_text(file_to_format)
+    path_formatted_file = Formatter.format_file(str(path))
     with open(path_formatted_file) as f:
         data = f.read()
     assert data == "SELECT DISTINCT my_table FROM b WHERE c=d"
@@ -1,34 +1,46 @@
 import jsonschema
-import unittest
 import pytest
 from pathlib import Path
+from typing import Any, Dict
 import os
 import json
 
-# Load all JSON files in RAM
 path_function_dictionaries = os.path.join(
     os.path.dirname(__file__), "..", "sql_translate", "function_dictionaries"
 )
 path_jsonschema = os.path.join(
     os.path.dirname(__file__), "samples", "jsonschema", "function_dictionaries.json"
 )
-files_to_review = {}
-for path_file in Path(os.path.join(path_function_dictionaries)).rglob("*.json"):
-    print(f"Loading {path_file} in memory")
-    with open(path_file) as f:
-        files_to_review[path_file] = json.load(f)
-assert files_to_review  # If empty list, file must have moved
 
 
-def test_dictionaries_against_jsonschema() -> None:
+@pytest.fixture(scope="session")
+def files_to_review() -> Dict[Path, Dict]:
+    # Load all JSON files in RAM, once and only if a test needs them
+    files = {}
+    for path_file in Path(path_function_dictionaries).rglob("*.json"):
+        print(f"Loading {path_file} in memory")
+        with open(path_file) as f:
+            files[path_file] = json.load(f)
+    assert files  # If empty, files must have moved
+    return files
+
+
+@pytest.fixture(scope="session")
+def validator() -> Any:
     with open(path_jsonschema) as f:
         schema = json.load(f)
+    cls = jsonschema.validators.validator_for(schema)  # Same draft selection as jsonschema.validate
+    cls.check_schema(schema)
+    return cls(schema)  # Built once, reused for every file
+
+
+def test_dictionaries_against_jsonschema(files_to_review: Dict[Path, Dict], validator: Any) -> None:
     for file_to_review, content in files_to_review.items():
         print(f"Validating {file_to_review} against jsonschema")
-        assert jsonschema.validate(content, schema) is None
+        assert validator.validate(content) is None
 
 
-def test_dictionaries_are_sorted() -> None:
+def test_dictionaries_are_sorted(files_to_review: Dict[Path, Dict]) -> None:
     for file_to_review, content in files_to_review.items():
         print(f"Validating {file_to_review} has sorted keys")
         assert list(content.keys()) == sorted(content.keys())
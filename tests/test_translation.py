@@ -1,11 +1,33 @@
 from unittest.mock import MagicMock
 import pytest
 import os
-from typing import Dict
-import sqlparse
+import pathlib
 from sql_translate import translation
 
 
+@pytest.fixture
+def translator() -> translation.HiveToPresto:
+    return translation.HiveToPresto()  # Function scope: tests replace its methods with mocks
+
+
+@pytest.fixture(scope="session")
+def file_to_translate() -> str:
+    with open(os.path.join(os.path.dirname(__file__), "samples", "translation", "file_to_translate.sql")) as f:
+        return f.read()  # Read once for the whole session
+
+
+def _identity(x: str, **kwargs) -> str:
+    return x
+
+
+def _stub_engines(translator: translation.HiveToPresto) -> None:
+    # Formatting & translation engines become identity functions
+    translator.Formatter.format_query = _identity
+    translator.GlobalTranslator.translate_query = _identity
+    translator.GlobalTranslator.move_insert_statement = _identity
+    translator.RecursiveTranslator.translate_query = _identity
+
+
 def test_create_parent() -> None:
     _Translator = translation._Translator()
 
@@ -16,42 +38,34 @@ def test_create_parent() -> None:
     ("With a as (select b from c) INSERT INTO table d.e PARTITION (f='g') SELECT d from a",
      "With a as (select b from c) INSERT INTO table d.e PARTITION (f='g') SELECT d from a")
 ])
-def test_translate_statement(statement: str, expected: str) -> None:
-    Translation = translation.HiveToPresto()
-    Translation.Formatter.format_query = MagicMock(side_effect=lambda x: x)
-    Translation.GlobalTranslator.translate_query = MagicMock(side_effect=lambda x: x)
-    Translation.RecursiveTranslator.translate_query = MagicMock(side_effect=lambda x, **kwargs: x)
-    Translation.GlobalTranslator.move_insert_statement = MagicMock(side_effect=lambda x: x)
-    result = Translation.translate_statement(statement)
+def test_translate_statement(translator: translation.HiveToPresto, statement: str, expected: str) -> None:
+    _stub_engines(translator)
+    result = translator.translate_statement(statement)
     assert result == expected
 
 
-def test_translate_statement_NotImplementedError() -> None:
-    Translation = translation.HiveToPresto()
-    print(Translation.Formatter.format_query)
-    Translation.Formatter.format_query = MagicMock(side_effect=Exception)
-    Translation.GlobalTranslator.translate_query = MagicMock(side_effect=lambda x: x)
-    Translation.RecursiveTranslator.translate_query = MagicMock(side_effect=lambda x: x)
+def test_translate_statement_NotImplementedError(translator: translation.HiveToPresto) -> None:
+    _stub_engines(translator)
+    translator.Formatter.format_query = MagicMock(side_effect=Exception)
     with pytest.raises(NotImplementedError):
-        Translation.translate_statement("select something from db.table;select col from cte")
+        translator.translate_statement("select something from db.table;select col from cte")
 
 
-def test_translate_statement_Exception() -> None:
-    Translation = translation.HiveToPresto()
-    Translation.Formatter.format_query = MagicMock(side_effect=Exception)
-    Translation.GlobalTranslator.translate_query = MagicMock(side_effect=lambda x: x)
-    Translation.RecursiveTranslator.translate_query = MagicMock(side_effect=lambda x: x)
+def test_translate_statement_Exception(translator: translation.HiveToPresto) -> None:
+    _stub_engines(translator)
+    translator.Formatter.format_query = MagicMock(side_effect=Exception)
     with pytest.raises(Exception):
-        Translation.translate_statement("select something from db.table")
+        translator.translate_statement("select something from db.table")
     with pytest.raises(Exception):
-        Translation.translate_statement("select something from db.table", verbose=True)
+        translator.translate_statement("select something from db.table", verbose=True)
 
 
-def test_translate_file() -> None:
-    Translation = translation.HiveToPresto()
-    Translation.translate_statement = MagicMock(side_effect=lambda x: x)
-    path_file = os.path.join(os.path.dirname(__file__), "samples", "translation", "file_to_translate.sql")
-    path_translated_file = Translation.translate_file(path_file)
+@pytest.mark.slow
+def test_translate_file(translator: translation.HiveToPresto, file_to_translate: str, tmp_path: pathlib.Path) -> None:
+    translator.translate_statement = MagicMock(side_effect=lambda x: x)
+    path_file = tmp_path / "file_to_translate.sql"
+    path_file.write_text(file_to_translate)
+    path_translated_file = translator.translate_file(str(path_file))
     with open(path_translated_file) as f:
         translated_data = f.read()
     assert translated_data == "with a as (select b from c) insert into table d.e PARTITION (f='g') select d from a"
@@ -1,7 +1,9 @@
 from unittest.mock import patch, MagicMock
+import functools
 import pytest
 import os
 import json
+from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 import sqlparse
 from sqlparse.tokens import Keyword, DML, Whitespace, Newline, Punctuation
@@ -9,11 +11,55 @@ from sql_translate import utils
 
 
 PATH_SAMPLES = os.path.join(os.path.dirname(__file__), "samples")
+PATH_DESCRIBE_FORMATTED = os.path.join(PATH_SAMPLES, "describe_formatted")
+PATH_PARSE_HIVE_INSERTION = os.path.join(PATH_SAMPLES, "parse_hive_insertion")
+PATH_NOT_PARTITIONNED_TABLE = os.path.join(PATH_DESCRIBE_FORMATTED, "not_partitionned_table.json")
+PATH_PARTITIONNED_TABLE = os.path.join(PATH_DESCRIBE_FORMATTED, "partitionned_table.json")
+
+# SQL shared by several parametrize tables
+SQL_SELECT_STAR_FROM_CTE = "select * from cte"
+SQL_EQUALS_LITERAL = "select a  = 'a' from cte"
+
+
+def _identity(x: str) -> str:
+    return x
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse(sql: str) -> sqlparse.sql.Statement:
+    return sqlparse.parse(sql)[0]  # Tests only read the tokens, so a parsed statement can be shared between test cases
+
+
+@pytest.fixture(scope="module")
+def column_caster() -> utils.ColumnCaster:
+    return utils.ColumnCaster()  # Stateless: a single instance is shared by the module
+
+
+@pytest.fixture
+def hive_explorer() -> utils.HiveTableExplorer:
+    return utils.HiveTableExplorer("")  # Function scope: tests replace its methods with mocks
+
+
+@pytest.fixture(scope="session")
+def describe_formatted_samples() -> Dict[str, Dict]:
+    samples = {}
+    for path_file in Path(PATH_DESCRIBE_FORMATTED).glob("*.json"):
+        with open(path_file) as f:
+            samples[os.path.join(PATH_DESCRIBE_FORMATTED, path_file.name)] = json.load(f)  # Read & decoded once for the whole session
+    return samples
+
+
+@pytest.fixture(scope="session")
+def parse_hive_insertion_samples() -> Dict[str, str]:
+    samples = {}
+    for path_file in Path(PATH_PARSE_HIVE_INSERTION).glob("*.sql"):
+        samples[os.path.join(PATH_PARSE_HIVE_INSERTION, path_file.name)] = path_file.read_text()  # Read once for the whole session
+    return samples
 
 
 def test_get_path_active_hive_files() -> None:
     paths_job_folders = [
-        os.path.join(os.path.dirname(__file__), "samples", "example_folder")
+        os.path.join(PATH_SAMPLES, "example_folder")
     ]
     assert utils.get_path_active_hive_files(paths_job_folders) == [
         {
@@ -34,16 +80,15 @@ def test_protect_regex_curly_brackets(query: str, expected: str) -> None:
     assert utils.protect_regex_curly_brackets(query) == expected
 
 
-@pytest.mark.parametrize(['query', 'expected'], [
-    ('select my_column as "7day" from cte', ("my_column", '"7day"')),
-    ('select my_column as "some column" from cte', ("my_column", '"some column"')),
-    ('select my_column as `some column (right)` from cte', ("my_column", '`some column (right)`')),
-    ("select my_column as c from cte", ("my_column", "c")),
-    ("select my_column from cte", ("my_column", None)),
-    ("select  my_column from cte", (" ", None))  # Target a whitespace, which does not have a get_alias method
+@pytest.mark.parametrize(['token', 'expected'], [
+    (_parse('select my_column as "7day" from cte').tokens[2], ("my_column", '"7day"')),
+    (_parse('select my_column as "some column" from cte').tokens[2], ("my_column", '"some column"')),
+    (_parse('select my_column as `some column (right)` from cte').tokens[2], ("my_column", '`some column (right)`')),
+    (_parse("select my_column as c from cte").tokens[2], ("my_column", "c")),
+    (_parse("select my_column from cte").tokens[2], ("my_column", None)),
+    (_parse("select  my_column from cte").tokens[2], (" ", None))  # Target a whitespace, which does not have a get_alias method
 ])
-def test_extract_alias(query: str, expected: Tuple[str, Optional[str]]) -> None:
-    token = sqlparse.parse(query)[0].tokens[2]
+def test_extract_alias(token: sqlparse.sql.Token, expected: Tuple[str, Optional[str]]) -> None:
     assert utils.extract_alias(token) == expected
 
 
@@ -52,7 +97,7 @@ def test_extract_alias(query: str, expected: Tuple[str, Optional[str]]) -> None:
     ({"latest_partitions": {"load_date": "2020-10-25"}, "partition_col_type": {"load_date": "date"}}, " AND ", True, "load_date=date('2020-10-25')"),
     ({"latest_partitions": {"load_date": "2020-10-25"}, "partition_col_type": {"load_date": "varchar"}}, " AND ", False, "load_date='2020-10-25'"),
     ({"latest_partitions": {"load_date": "1"}, "partition_col_type": {"load_date": "integer"}}, " AND ", False, "load_date=1")
-])
+], ids=["date_no_cast", "date_cast", "varchar", "integer"])
 def test_partition_builder(table_params: Dict[str, str], join_key: str, date_cast: bool, expected: str) -> None:
     assert utils.partition_builder(table_params, join_key=join_key, date_cast=date_cast) == expected
 
@@ -98,17 +143,16 @@ def test_char_to_number_NotImplementedError(value: str, required_type: str) -> N
     ('1', 'double')
 ])
 def test_char_to_number_TypeError(value: str, required_type: str) -> None:
-    with pytest.raises(Exception):
+    with pytest.raises(TypeError):
         utils.char_to_number(value, required_type)
 
 
-@pytest.mark.parametrize(['describe_formatted_output'], [
-    ("not_partitionned_table.json",),
-    ("partitionned_table.json",)
-])
-def test_parse_describe_formatted(describe_formatted_output: str) -> None:
-    with open(os.path.join(PATH_SAMPLES, "describe_formatted", describe_formatted_output)) as f:
-        data = json.load(f)
+@pytest.mark.parametrize(['path'], [
+    (PATH_NOT_PARTITIONNED_TABLE,),
+    (PATH_PARTITIONNED_TABLE,)
+], ids=["not_partitionned", "partitionned"])
+def test_parse_describe_formatted(describe_formatted_samples: Dict[str, Dict], path: str) -> None:
+    data = describe_formatted_samples[path]
     assert utils.parse_describe_formatted(data["query_output"]) == data["expected"]
 
 
@@ -126,26 +170,24 @@ def test_decode_utf8(input_text: str, expected: str) -> None:
     utils.decode_utf8(input_text) == expected
 
 
-@pytest.mark.parametrize(['path_file', 'expected'], [
-    ("not_partitioned_into.sql", ("into", "output_db", "output_table", {})),
-    ("not_partitioned_overwrite.sql", ("overwrite", "output_db", "output_table", {})),
+@pytest.mark.parametrize(['path', 'expected'], [
+    (os.path.join(PATH_PARSE_HIVE_INSERTION, "not_partitioned_into.sql"), ("into", "output_db", "output_table", {})),
+    (os.path.join(PATH_PARSE_HIVE_INSERTION, "not_partitioned_overwrite.sql"), ("overwrite", "output_db", "output_table", {})),
     (
-        "partitioned_into.sql",
+        os.path.join(PATH_PARSE_HIVE_INSERTION, "partitioned_into.sql"),
         ("into", "output_db", "output_table", {"partition_name": "load_date", "partition_value": "'2020-03-25'"})
     ),
     (
-        "partitioned_overwrite.sql",
+        os.path.join(PATH_PARSE_HIVE_INSERTION, "partitioned_overwrite.sql"),
         ("overwrite", "output_db", "output_table", {"partition_name": "load_date", "partition_value": "'2020-03-25'"})
     ),
     (
-        "dynamic_partitioning.sql",
+        os.path.join(PATH_PARSE_HIVE_INSERTION, "dynamic_partitioning.sql"),
         ("overwrite", "output_db", "output_table", {"partition_name": "load_date", "partition_value": None})
     )
-])
-def test_parse_hive_insertion(path_file: str, expected: Tuple[str, Dict]) -> None:
-    with open(os.path.join(PATH_SAMPLES, "parse_hive_insertion", path_file)) as f:
-        sql = f.read()
-    assert utils.parse_hive_insertion(sql) == expected
+], ids=["not_partitioned_into", "not_partitioned_overwrite", "partitioned_into", "partitioned_overwrite", "dynamic_partitioning"])
+def test_parse_hive_insertion(parse_hive_insertion_samples: Dict[str, str], path: str, expected: Tuple[str, Dict]) -> None:
+    assert utils.parse_hive_insertion(parse_hive_insertion_samples[path]) == expected
 
 
 @pytest.mark.parametrize(['query', 'expected'], [
@@ -158,7 +200,7 @@ def test_parse_hive_insertion(path_file: str, expected: Tuple[str, Dict]) -> Non
     ("select a b, c from cte", (False, [0, 14], [["a", "b"], ["c", None]])),
     ("select a OR b c, d and e, f from cte", (False, [0, 28], [["a OR b", "c"], ["d and e", None], ["f", None]])),
     ("select a, array['-1'] as sth from cte", (False, [0, 29], [["a", None], ["array['-1']", "sth"]]))
-])
+], ids=["masking", "masking_null", "double_masking", "stars", "stuff_before_select", "distinct", "implicit_alias", "boolean_operators", "array_literal"])
 def test_parse_final_select(query: str, expected: Tuple[bool, Dict[str, Optional[str]]]) -> None:
     assert utils.parse_final_select(query) == expected
 
@@ -167,11 +209,10 @@ def test_parse_final_select(query: str, expected: Tuple[bool, Dict[str, Optional
 @pytest.mark.parametrize(['partitions', 'expected'], [
     ([("a=1",), ("a=2",)], {"a": 2})
 ])
-def test_get_latest_partitions(mock_fetch: MagicMock, partitions: List[Tuple[str]], expected: str) -> None:
-    HiveTableExplorer = utils.HiveTableExplorer("")
-    HiveTableExplorer.decode_utf8 = MagicMock(side_effect=lambda x: x)  # Return input without change
+def test_get_latest_partitions(mock_fetch: MagicMock, hive_explorer: utils.HiveTableExplorer, partitions: List[Tuple[str]], expected: str) -> None:
+    hive_explorer.decode_utf8 = _identity  # Return input without change
     mock_fetch.return_value = partitions
-    HiveTableExplorer._get_latest_partitions("")
+    hive_explorer._get_latest_partitions("")
 
 
 @patch('sql_translate.utils.fetch')
@@ -179,103 +220,94 @@ def test_get_latest_partitions(mock_fetch: MagicMock, partitions: List[Tuple[str
     ([],),
     ([("a=1/b=0",), ("a=2/b=3",)],)
 ])
-def test_get_latest_partitions_ValueError(mock_fetch: MagicMock, partitions: List[Tuple[str]]) -> None:
-    HiveTableExplorer = utils.HiveTableExplorer("")
-    HiveTableExplorer.decode_utf8 = MagicMock(side_effect=lambda x: x)  # Return input without change
+def test_get_latest_partitions_ValueError(mock_fetch: MagicMock, hive_explorer: utils.HiveTableExplorer, partitions: List[Tuple[str]]) -> None:
+    hive_explorer.decode_utf8 = _identity  # Return input without change
     mock_fetch.return_value = partitions
     with pytest.raises(ValueError):
-        HiveTableExplorer._get_latest_partitions("")
+        hive_explorer._get_latest_partitions("")
 
 
-@patch('sql_translate.utils.fetch')
-@patch('sql_translate.utils.parse_describe_formatted', return_value={"a", "b"})
-def test_describe_formatted(mock_fetch: MagicMock, mock_parse_describe_formatted: MagicMock) -> None:
-    HiveTableExplorer = utils.HiveTableExplorer("")
-    mock_fetch.return_value = "b"
-    HiveTableExplorer._describe_formatted("a") == {"a", "b"}
+def test_describe_formatted(monkeypatch: pytest.MonkeyPatch, hive_explorer: utils.HiveTableExplorer) -> None:
+    monkeypatch.setattr(utils, "fetch", lambda query, conn: "b")
+    monkeypatch.setattr(utils, "parse_describe_formatted", lambda query_output: {"a", query_output})
+    assert hive_explorer._describe_formatted("a") == {"a", "b"}
 
 
-@pytest.mark.parametrize(['path_describe_formatted_output', 'expected'], [
-    ("not_partitionned_table.json",
+@pytest.mark.parametrize(['path', 'expected'], [
+    (PATH_NOT_PARTITIONNED_TABLE,
      {
          "name": "my_table",
          "table_location": "storage_location",
-         "columns": {"a": "string", "b": "string", "c": "string"}
+         "columns": {"a": "string", "b": "string", "c": "string"},
+         "partition_col_type": {},
+         "latest_partitions": {}
      }),
-    ("partitionned_table.json", {
+    (PATH_PARTITIONNED_TABLE, {
         "name": "my_table",
         "table_location": "storage_location",
         "columns": {"a": "varchar(50)", "b": "bigint"},
         "partition_col_type": {"date_timestamp": "char(10)"},
         "latest_partitions": {"date_timestamp": "1"}
     })
-])
-def test_get_table_properties(path_describe_formatted_output: Dict, expected: Dict) -> None:
-    HiveTableExplorer = utils.HiveTableExplorer("")
-    with open(os.path.join(os.path.dirname(__file__), "samples", "describe_formatted", path_describe_formatted_output)) as f:
-        describe_formatted_output = json.load(f)["expected"]
-    HiveTableExplorer._describe_formatted = MagicMock(return_value=describe_formatted_output)
-    HiveTableExplorer._get_latest_partitions = MagicMock(return_value={"date_timestamp": "1"})
-    HiveTableExplorer.get_table_properties("db.my_table") == expected
+], ids=["not_partitionned", "partitionned"])
+def test_get_table_properties(hive_explorer: utils.HiveTableExplorer, describe_formatted_samples: Dict[str, Dict], path: str, expected: Dict) -> None:
+    describe_formatted_output = describe_formatted_samples[path]["expected"]
+    hive_explorer._describe_formatted = lambda table_name: describe_formatted_output
+    hive_explorer._get_latest_partitions = lambda table_name: {"date_timestamp": "1"}
+    assert hive_explorer.get_table_properties("db.my_table") == expected
 
 
 @pytest.mark.parametrize(['sql', 'line', 'column', 'expected'], [
-    ("select * from cte", 0, 9, {"value": "from", "idx": 9}),
+    (SQL_SELECT_STAR_FROM_CTE, 0, 9, {"value": "from", "idx": 9}),
     ("select *\nfrom cte", 1, 0, {"value": "from", "idx": 9})
 ])
-def test_get_problematic_token(sql: str, line: int, column: int, expected: Dict) -> None:
-    ColumnCaster = utils.ColumnCaster()
-    token, idx = ColumnCaster.get_problematic_token(sql, line, column)
+def test_get_problematic_token(column_caster: utils.ColumnCaster, sql: str, line: int, column: int, expected: Dict) -> None:
+    token, idx = column_caster.get_problematic_token(sql, line, column)
     assert token.value == expected["value"] and idx == expected["idx"]
 
 
 @pytest.mark.parametrize(['sql', 'line', 'column'], [
-    ("select * from cte", 0, 10)
+    (SQL_SELECT_STAR_FROM_CTE, 0, 10)
 ])
-def test_get_problematic_token_AttributeError(sql: str, line: int, column: int) -> None:
-    ColumnCaster = utils.ColumnCaster()
+def test_get_problematic_token_AttributeError(column_caster: utils.ColumnCaster, sql: str, line: int, column: int) -> None:
     with pytest.raises(AttributeError):
-        ColumnCaster.get_problematic_token(sql, line, column)
+        column_caster.get_problematic_token(sql, line, column)
 
 
 @pytest.mark.parametrize(['sql', 'line', 'column'], [
-    ("select * from cte", 1, 10)
+    (SQL_SELECT_STAR_FROM_CTE, 1, 10)
 ])
-def test_get_problematic_token_ValueError(sql: str, line: int, column: int) -> None:
-    ColumnCaster = utils.ColumnCaster()
+def test_get_problematic_token_ValueError(column_caster: utils.ColumnCaster, sql: str, line: int, column: int) -> None:
     with pytest.raises(ValueError):
-        ColumnCaster.get_problematic_token(sql, line, column)
+        column_caster.get_problematic_token(sql, line, column)
 
 
 @pytest.mark.parametrize(['token', 'cast_to', 'data_type', 'expected'], [
-    ("a", "varchar", "varchar (1)", "a"),
-    ("a", "varchar", "bigint (1)", "cast(a AS varchar)"),
-    ("a", "char(3)", "char(3)", "a"),
-    ("a", "char(3)", "char(4)", "cast(a AS char(3))")
+    (_parse("a").tokens[0], "varchar", "varchar (1)", "a"),
+    (_parse("a").tokens[0], "varchar", "bigint (1)", "cast(a AS varchar)"),
+    (_parse("a").tokens[0], "char(3)", "char(3)", "a"),
+    (_parse("a").tokens[0], "char(3)", "char(4)", "cast(a AS char(3))")
 ])
-def test_light_cast(token, cast_to: str, data_type: str, expected: str) -> None:
-    ColumnCaster = utils.ColumnCaster()
-    assert ColumnCaster._light_cast(sqlparse.parse(token)[0].tokens[0], cast_to, data_type) == expected
+def test_light_cast(column_caster: utils.ColumnCaster, token: sqlparse.sql.Token, cast_to: str, data_type: str, expected: str) -> None:
+    assert column_caster._light_cast(token, cast_to, data_type) == expected
 
 
 @pytest.mark.parametrize(['sql', 'loc', 'cast_to', 'bck', 'fwd', 'groupdict', 'expected'], [
-    ("select a  = 'a' from cte", [0, 10], "varchar", 1, 1, {"b_type_0": "", "f_type_0": "varchar"}, "select cast(a AS varchar)  = 'a' from cte"),
+    (SQL_EQUALS_LITERAL, [0, 10], "varchar", 1, 1, {"b_type_0": "", "f_type_0": "varchar"}, "select cast(a AS varchar)  = 'a' from cte"),
     ("select count(a)/2 from cte", [0, 15], "double", 1, 1, {"b_type_0": "", "f_type_0": ""}, "select cast(count(a) AS double)/cast(2 AS double) from cte"),
     ("select *\nfrom cte\nwhere max(a) = min(b)", [2, 13], "varchar", 1, 1, {"b_type_0": "", "f_type_0": ""}, "select *\nfrom cte\nwhere cast(max(a) AS varchar) = cast(min(b) AS varchar)"),
     ("select *\nfrom cte\nwhere a\nbetween b/2 and c", [3, 0], "varchar", 1, 3, {"b_type_0": "", "f_type_0": "",
                                                                                  "f_type_1": ""}, "select *\nfrom cte\nwhere cast(a AS varchar)\nbetween cast(b/2 AS varchar) and cast(c AS varchar)"),
-])
-def test_cast_non_trivial_tokens(sql: str, loc: List[int], cast_to: str, bck: int, fwd: int, groupdict: Dict, expected: Dict) -> None:
-    ColumnCaster = utils.ColumnCaster()
-    token, idx = ColumnCaster.get_problematic_token(sql, *loc)
-    assert ColumnCaster.cast_non_trivial_tokens(sql, token, idx, cast_to, groupdict, count_backward_tokens=bck, count_forward_tokens=fwd) == expected
+], ids=["equals_literal", "division", "where_comparison", "between"])
+def test_cast_non_trivial_tokens(column_caster: utils.ColumnCaster, sql: str, loc: List[int], cast_to: str, bck: int, fwd: int, groupdict: Dict, expected: Dict) -> None:
+    token, idx = column_caster.get_problematic_token(sql, *loc)
+    assert column_caster.cast_non_trivial_tokens(sql, token, idx, cast_to, groupdict, count_backward_tokens=bck, count_forward_tokens=fwd) == expected
 
 
 @pytest.mark.parametrize(['sql', 'loc', 'cast_to', 'groupdict'], [
-    ("select a  = 'a' from cte", [0, 10], "varchar", {"b_type_0": "", "f_type_0": "varchar"})
+    (SQL_EQUALS_LITERAL, [0, 10], "varchar", {"b_type_0": "", "f_type_0": "varchar"})
 ])
-def test_cast_non_trivial_tokens_ValueError(sql: str, loc: List[int], cast_to: str, groupdict: Dict) -> None:
-    ColumnCaster = utils.ColumnCaster()
-    token, idx = ColumnCaster.get_problematic_token(sql, *loc)
+def test_cast_non_trivial_tokens_ValueError(column_caster: utils.ColumnCaster, sql: str, loc: List[int], cast_to: str, groupdict: Dict) -> None:
+    token, idx = column_caster.get_problematic_token(sql, *loc)
     with pytest.raises(ValueError):
-        ColumnCaster.cast_non_trivial_tokens(sql, token, idx, cast_to, groupdict, count_backward_tokens=10)
+        column_caster.cast_non_trivial_tokens(sql, token, idx, cast_to, groupdict, count_backward_tokens=10)
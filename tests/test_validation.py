@@ -1,57 +1,145 @@
-import unittest
-from unittest.mock import patch, MagicMock, call
+from unittest.mock import patch, Mock, MagicMock, call
 import pytest
-import contextlib
+import copy
+import json
+import logging
 import os
+import pathlib
 import re
-from typing import Dict, List, Tuple, Any
-import sqlparse
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Tuple
 from sql_translate import validation
 
 TableComparator = validation.TableComparator("test_db", "", "")
 PATH_SAMPLES = os.path.join(os.path.dirname(__file__), "samples")
-TABLE_PROPERTIES_PARTITIONED = {
+ValidatorFactory = Callable[..., validation.HiveToPresto]
+
+# Shared, read-only inputs
+TABLE_PROPERTIES_PARTITIONED = MappingProxyType({
     "name": "temp_table",
-    "columns": ["b"],
-    "partition_col_type": {"a": "varchar"},
-    "latest_partitions": {"a": "2020-03-25"}
-}
-TABLE_PROPERTIES_NOT_PARTITIONED = {
+    "columns": ("b",),
+    "partition_col_type": MappingProxyType({"a": "varchar"}),
+    "latest_partitions": MappingProxyType({"a": "2020-03-25"})
+})
+TABLE_PROPERTIES_NOT_PARTITIONED = MappingProxyType({
     "name": "temp_table",
-    "columns": ["b"],
-    "partition_col_type": {},
-    "latest_partitions": {}
-}
-
-
-def test_set_paths() -> None:
-    Validator = validation.HiveToPresto("", "", "", "")
+    "columns": ("b",),
+    "partition_col_type": MappingProxyType({}),
+    "latest_partitions": MappingProxyType({})
+})
+TABLE_INFO_1 = MappingProxyType({
+    "name": "a",
+    "columns": ("c1", "c2"),
+    "latest_partitions": MappingProxyType({"c1": "2020-03-25"}),
+    "partition_col_type": MappingProxyType({"c1": "varchar"})
+})
+TABLE_INFO_2 = MappingProxyType({**TABLE_INFO_1, "name": "b"})
+COLUMN_COUNT_DIFFERENCES_C2 = MappingProxyType({
+    "count_c2": MappingProxyType({"table_1": 10, "table_2": 9}),
+    "count_distinct_c2": MappingProxyType({"table_1": 5, "table_2": 4})
+})
+ROW_DIFFERENCES_IDENTICAL = validation.RowDifferences(10, 10, 5, 5, 0, 0, 5)
+ROW_DIFFERENCES_HALF = validation.RowDifferences(10, 10, 5, 4, 2, 1, 3)
+ROW_DIFFERENCES_EMPTY = validation.RowDifferences(0, 0, 0, 0, 0, 0, 0)
+
+EXPECTED_SANDBOX_DROP_CALL = call("DROP TABLE IF EXISTS test_db.my_table", "")
+EXPECTED_SANDBOX_HIVE_PARTITIONED_CALL = call((
+    "CREATE TABLE IF NOT EXISTS test_db.my_table (\n"
+    "7day varchar\n"
+    ")\n"
+    "COMMENT 'Validation table for my_table'\n"
+    "PARTITIONED BY (b string)\n"
+    "STORED AS PARQUET\n"
+    "LOCATION 'test_storage_location/my_table';"
+), "")
+EXPECTED_SANDBOX_HIVE_NOT_PARTITIONED_CALL = call((
+    "CREATE TABLE IF NOT EXISTS test_db.my_table (\n"
+    "7day varchar\n"
+    ")\n"
+    "COMMENT 'Validation table for my_table'\n"
+    "\nSTORED AS PARQUET\n"
+    "LOCATION 'test_storage_location/my_table';"
+), "")
+EXPECTED_SANDBOX_PRESTO_PARTITIONED_CALL = call((
+    "CREATE TABLE IF NOT EXISTS test_db.my_table (\n"
+    '"7day" varchar\n'
+    ")\n"
+    "COMMENT 'Validation table for my_table'\n"
+    "PARTITIONED BY (b string)\n"
+    "STORED AS PARQUET\n"
+    "LOCATION 'test_storage_location/my_table';"
+), "")
+EXPECTED_HIVE_INSERT_CALLS = (
+    call("SET hive.exec.dynamic.partition.mode=strict", ""),
+    call("select my_column from b\nINSERT OVERWRITE TABLE test_db.temp_table", ""),
+    call("SET hive.exec.dynamic.partition.mode=strict", ""),
+    call("select my_column from b\nINSERT OVERWRITE TABLE test_db.temp_table PARTITION (a='2020-03-25')", ""),
+    call("SET hive.exec.dynamic.partition.mode=nonstrict", ""),
+    call("select my_column from b\nINSERT OVERWRITE TABLE test_db.temp_table PARTITION (a)", "")
+)
+
+PRESTO_ERROR_IDENTICAL = (
+    "\"[HY000] [Teradata][Presto] (1060) Presto Query Error: line 1:11: "
+    "'=' cannot be applied to integer, varchar\")----"
+)
+PRESTO_ERROR_UNKNOWN = (
+    "\"[HY000] [Teradata][Presto] (1060) Presto Query Error: "
+    "UNKNOWN ERROR\")----"
+)
+
+
+@pytest.fixture(scope="module")
+def validator_factory() -> ValidatorFactory:
+    base = validation.HiveToPresto("", "", "", "")  # Built once per module
+
+    def make(**attributes: Any) -> validation.HiveToPresto:
+        Validator = copy.copy(base)
+        # Tests replace methods on the sub objects: they must not leak into the other tests
+        Validator.TableComparator = copy.copy(base.TableComparator)
+        Validator.HiveTableExplorer = copy.copy(base.HiveTableExplorer)
+        Validator.__dict__.update(attributes)
+        Validator.TableComparator.test_database = Validator.test_database
+        return Validator
+    return make
+
+
+def test_set_paths(validator_factory: ValidatorFactory) -> None:
+    Validator = validator_factory()
     path_src = os.path.join(PATH_SAMPLES, "translation", "complex_statement.hive")
     path_tgt = os.path.join(PATH_SAMPLES, "translation", "complex_statement.presto")
     Validator.set_paths(path_src, path_tgt)
 
 
-@pytest.mark.parametrize(['config_data', 'expected'], [
-    ({"query_parameters": {"test.sql": {"a": "test_udf.hello()"}}, "udf_replacements": {"b": "c"}}, ("temp_test_udf.py", {"test_udf": "temp_test_udf"}, {'a': 'test_udf.hello()'})),
-    ({"query_parameters": {}}, ("test_udf.py", {"test_udf": "test_udf"}, {})),
-])
-def test_get_or_create_temp_udf(config_data: Dict, expected: Tuple[str, Dict, Dict]) -> None:
-    Validator = validation.HiveToPresto("", "", "", "")
+@pytest.mark.parametrize(['config_data', 'udf_name', 'udf_mapping', 'query_parameters'], [
+    ({"query_parameters": {"test.sql": {"a": "test_udf.hello()"}}, "udf_replacements": {"b": "c"}}, "temp_test_udf.py", {"test_udf": "temp_test_udf"}, {'a': 'test_udf.hello()'}),
+    ({"query_parameters": {}}, "test_udf.py", {"test_udf": "test_udf"}, {}),
+], ids=["query_parameters", "no_query_parameters"])
+def test_get_or_create_temp_udf(validator_factory: ValidatorFactory, tmp_path: pathlib.Path, config_data: Dict, udf_name: str, udf_mapping: Dict, query_parameters: Dict) -> None:
+    Validator = validator_factory()
     Validator.path_src_sql = "test.sql"
-    with open("test_udf.py", "w") as f:
-        f.write("""
+    path_udf = tmp_path / "test_udf.py"
+    path_udf.write_text("""
 def hello():
     return 1
 """)
-    assert Validator._get_or_create_temp_udf(config_data, "test_udf.py") == expected
-    with contextlib.suppress(FileNotFoundError):
-        os.remove("test_udf.py")
-        os.remove("temp_test_udf.py")
+    assert Validator._get_or_create_temp_udf(config_data, str(path_udf)) == (str(tmp_path / udf_name), udf_mapping, query_parameters)
+
 
+@pytest.fixture(scope="session")
+def translation_config() -> Dict:
+    with open(os.path.join(PATH_SAMPLES, "translation", "config.json")) as f:
+        return json.load(f)
 
-def test_evaluate_udfs() -> None:
-    Validator = validation.HiveToPresto("", "", "", "")
+
+def test_read_config(validator_factory: ValidatorFactory, translation_config: Dict) -> None:
+    Validator = validator_factory()
+    assert Validator._read_config(os.path.join(PATH_SAMPLES, "translation", "config.json")) == translation_config
+
+
+def test_evaluate_udfs(validator_factory: ValidatorFactory, monkeypatch: pytest.MonkeyPatch, translation_config: Dict) -> None:
+    Validator = validator_factory()
     Validator.path_src_sql = os.path.join(PATH_SAMPLES, "translation", "complex_statement.hive")
+    monkeypatch.setattr(Validator, "_read_config", lambda path_config: translation_config)
     Validator.temp_src_table_properties = {"latest_partitions": {}}
     Validator.evaluate_udfs("")
     assert Validator.evaluated_query_parameters == {
@@ -61,10 +149,10 @@ def test_evaluate_udfs() -> None:
 
 
 @patch('sql_translate.validation.utils.parse_hive_insertion', return_value=("", "", "temp_table", ""))
-def test_get_and_create_table_properties(mock_parse_hive_insertion: MagicMock) -> None:
-    Validator = validation.HiveToPresto("", "", "", "")
+def test_get_and_create_table_properties(mock_parse_hive_insertion: MagicMock, validator_factory: ValidatorFactory) -> None:
+    Validator = validator_factory()
     Validator.src_sql = ""
-    Validator.HiveTableExplorer.get_table_properties = MagicMock(return_value=TABLE_PROPERTIES_PARTITIONED)
+    Validator.HiveTableExplorer.get_table_properties = Mock(return_value=TABLE_PROPERTIES_PARTITIONED)
     Validator.get_and_create_table_properties("")
 
 
@@ -73,77 +161,36 @@ def test_get_and_create_table_properties(mock_parse_hive_insertion: MagicMock) -
     ("decimal", "double"),
     ("varchar", "varchar")
 ])
-def test_upscale_integers(data_type: str, expected: str) -> None:
-    Validator = validation.HiveToPresto("", "", "", "")
+def test_upscale_integers(validator_factory: ValidatorFactory, data_type: str, expected: str) -> None:
+    Validator = validator_factory()
     assert Validator.upscale_integers(data_type) == expected
 
 
-def test_create_sandbox_tables() -> None:
-    Validator = validation.HiveToPresto("", "", "", "")
+def test_create_sandbox_tables(validator_factory: ValidatorFactory) -> None:
+    Validator = validator_factory()
     Validator.temp_src_table_properties = TABLE_PROPERTIES_PARTITIONED
     Validator.temp_tgt_table_properties = TABLE_PROPERTIES_PARTITIONED
-    Validator._create_sandbox_table = MagicMock()
+    Validator._create_sandbox_table = Mock()
     Validator.create_sandbox_tables()
 
 
 @patch('sql_translate.validation.run_query', return_value=None)
-def test_create_sandbox_table(mock_run_query: MagicMock) -> None:
-    Validator = validation.HiveToPresto("", "", "test_db", "")
-    table_name = "my_table"
-    column_info = {"7day": "varchar"}
+@pytest.mark.parametrize(['engine', 'partition_info', 'expected_call'], [
+    ("hive", {"b": "string"}, EXPECTED_SANDBOX_HIVE_PARTITIONED_CALL),
+    ("hive", {}, EXPECTED_SANDBOX_HIVE_NOT_PARTITIONED_CALL),
+    ("presto", {"b": "string"}, EXPECTED_SANDBOX_PRESTO_PARTITIONED_CALL)
+], ids=["hive_partitioned", "hive_not_partitioned", "presto_partitioned"])
+def test_create_sandbox_table(mock_run_query: MagicMock, validator_factory: ValidatorFactory, engine: str, partition_info: Dict[str, str], expected_call: Any) -> None:
+    Validator = validator_factory(test_database="test_db")
     Validator.storage_location = "test_storage_location"
-    # HIVE
-    engine = "hive"
-    # Partitioned table
-    partition_info = {"b": "string"}
-    Validator._create_sandbox_table(table_name, column_info, partition_info, engine)
-    # Table not partitioned
-    partition_info = {}
-    Validator._create_sandbox_table(table_name, column_info, partition_info, engine)
-    # PRESTO
-    engine = "presto"
-    # Partitioned table
-    partition_info = {"b": "string"}
-    Validator._create_sandbox_table(table_name, column_info, partition_info, engine)
-
-    expected_calls = [
-        call("DROP TABLE IF EXISTS test_db.my_table", ""),
-        call((
-            "CREATE TABLE IF NOT EXISTS test_db.my_table (\n"
-            "7day varchar\n"
-            ")\n"
-            "COMMENT 'Validation table for my_table'\n"
-            "PARTITIONED BY (b string)\n"
-            "STORED AS PARQUET\n"
-            "LOCATION 'test_storage_location/my_table';"
-        ), ""),
-        call("DROP TABLE IF EXISTS test_db.my_table", ""),
-        call((
-            "CREATE TABLE IF NOT EXISTS test_db.my_table (\n"
-            "7day varchar\n"
-            ")\n"
-            "COMMENT 'Validation table for my_table'\n"
-            "\nSTORED AS PARQUET\n"
-            "LOCATION 'test_storage_location/my_table';"
-        ), ""),
-        call("DROP TABLE IF EXISTS test_db.my_table", ""),
-        call((
-            "CREATE TABLE IF NOT EXISTS test_db.my_table (\n"
-            '"7day" varchar\n'
-            ")\n"
-            "COMMENT 'Validation table for my_table'\n"
-            "PARTITIONED BY (b string)\n"
-            "STORED AS PARQUET\n"
-            "LOCATION 'test_storage_location/my_table';"
-        ), "")
-    ]
-    mock_run_query.assert_has_calls(expected_calls)
+    Validator._create_sandbox_table("my_table", {"7day": "varchar"}, partition_info, engine)
+    assert mock_run_query.call_args_list == [EXPECTED_SANDBOX_DROP_CALL, expected_call]
 
 
 @patch('sql_translate.validation.run_query', return_value=None)
-def test_insert_into_hive_table(mock_run_query: MagicMock) -> None:
+def test_insert_into_hive_table(mock_run_query: MagicMock, validator_factory: ValidatorFactory) -> None:
     # Set up
-    Validator = validation.HiveToPresto("", "", "test_db", "")
+    Validator = validator_factory(test_database="test_db")
     Validator.evaluated_query_parameters = {"my_col": "my_column"}
 
     # Table not partitioned
@@ -162,37 +209,29 @@ def test_insert_into_hive_table(mock_run_query: MagicMock) -> None:
     Validator.insert_into_hive_table()
 
     # Check
-    expected_calls = [
-        call("SET hive.exec.dynamic.partition.mode=strict", ""),
-        call("select my_column from b\nINSERT OVERWRITE TABLE test_db.temp_table", ""),
-        call("SET hive.exec.dynamic.partition.mode=strict", ""),
-        call("select my_column from b\nINSERT OVERWRITE TABLE test_db.temp_table PARTITION (a='2020-03-25')", ""),
-        call("SET hive.exec.dynamic.partition.mode=nonstrict", ""),
-        call("select my_column from b\nINSERT OVERWRITE TABLE test_db.temp_table PARTITION (a)", "")
-    ]
-    mock_run_query.assert_has_calls(expected_calls)
+    assert mock_run_query.call_args_list == list(EXPECTED_HIVE_INSERT_CALLS)
 
 
 @patch('sql_translate.validation.fetch')
-@pytest.mark.parametrize(['fetch_output'], [
-    ([(0,)],),
-    ([(1,)],),
-])
-def test_insert_into_presto_table(mock_fetch: MagicMock, capsys, fetch_output: List[Tuple[int]]) -> None:
+@pytest.mark.parametrize(['fetch_output', 'empty_warning'], [
+    ([(0,)], True),
+    ([(1,)], False),
+], ids=["empty_table", "non_empty_table"])
+def test_insert_into_presto_table(mock_fetch: MagicMock, validator_factory: ValidatorFactory, caplog: pytest.LogCaptureFixture, fetch_output: List[Tuple[int]], empty_warning: bool) -> None:
     mock_fetch.return_value = fetch_output
-    Validator = validation.HiveToPresto("", "", "test_db", "")
+    Validator = validator_factory(test_database="test_db")
     Validator.evaluated_query_parameters = {"a": "my_column"}
     Validator.temp_tgt_table_properties = TABLE_PROPERTIES_NOT_PARTITIONED
     Validator.tgt_sql = "INSERT into db.c select {a} from b"
-    Validator._presto_runner = MagicMock(side_effect=lambda x, y: print(y))
+    Validator._presto_runner = Mock(return_value="")
     Validator.insert_into_presto_table()
-    captured = capsys.readouterr()
-    assert "INSERT into db.c select {a} from b" in captured.out.split("\n")
+    assert Validator._presto_runner.call_args == call("INSERT INTO test_db.temp_table select my_column from b", "INSERT into db.c select {a} from b")
+    assert ("the count is still 0" in caplog.text) == empty_warning
 
 
 @patch('sql_translate.validation.run_query', return_value=None)
-def test_presto_runner(mock_run_query: MagicMock) -> None:
-    Validator = validation.HiveToPresto("", "", "test_db", "")
+def test_presto_runner(mock_run_query: MagicMock, validator_factory: ValidatorFactory) -> None:
+    Validator = validator_factory(test_database="test_db")
     Validator.temp_tgt_table_properties = {}
     assert Validator._presto_runner(
         "select my_column from b\nINSERT into TABLE test_db.test_table",
@@ -201,70 +240,58 @@ def test_presto_runner(mock_run_query: MagicMock) -> None:
 
 
 @patch('sql_translate.validation.run_query')
-def test_presto_runner_Exception_identical_error(mock_run_query: MagicMock) -> None:
-    Validator = validation.HiveToPresto("", "", "", "")
+def test_presto_runner_Exception_identical_error(mock_run_query: MagicMock, validator_factory: ValidatorFactory) -> None:
+    Validator = validator_factory()
     Validator.temp_tgt_table_properties = {}
-    msg = (
-        "\"[HY000] [Teradata][Presto] (1060) Presto Query Error: line 1:11: "
-        "'=' cannot be applied to integer, varchar\")----"
-    )
-    mock_run_query.side_effect = Exception(msg)
-    with pytest.raises(RuntimeError) as err:
+    mock_run_query.side_effect = Exception(PRESTO_ERROR_IDENTICAL)
+    with pytest.raises(RuntimeError, match=re.escape("'=' cannot be applied to integer, varchar")):
         Validator._presto_runner(
             "select 'a'=1",
             "select 'a'=1"
         )
-        assert "'=' cannot be applied to integer, varchar" in str(err)
 
 
 @patch('sql_translate.validation.run_query')
-def test_presto_runner_Exception_unknown_error(mock_run_query: MagicMock) -> None:
-    Validator = validation.HiveToPresto("", "", "", "")
+def test_presto_runner_Exception_unknown_error(mock_run_query: MagicMock, validator_factory: ValidatorFactory) -> None:
+    Validator = validator_factory()
     Validator.temp_tgt_table_properties = {}
-    msg = (
-        "\"[HY000] [Teradata][Presto] (1060) Presto Query Error: "
-        "UNKNOWN ERROR\")----"
-    )
-    mock_run_query.side_effect = Exception(msg)
-    with pytest.raises(RuntimeError) as err:
+    mock_run_query.side_effect = Exception(PRESTO_ERROR_UNKNOWN)
+    with pytest.raises(RuntimeError, match=re.escape("UNKNOWN ERROR")):
         Validator._presto_runner(
             "select my_column from b\nINSERT into TABLE test_db.test_table",
             "select a from b\nINSERT into TABLE db.test_table"
         )
-        assert "UNKNOWN ERROR" in str(err)
 
 
-def test_validate_dml() -> None:
-    with open("test_original.sql", "w") as f:
-        f.write("Hello world!")
-    with open("test_translation.sql", "w") as f:
-        f.write("Hello world!")
-    Validator = validation.HiveToPresto("", "", "", "")
+def test_validate_dml(validator_factory: ValidatorFactory, tmp_path: pathlib.Path) -> None:
+    path_original = tmp_path / "test_original.sql"
+    path_translation = tmp_path / "test_translation.sql"
+    path_original.write_text("Hello world!")
+    path_translation.write_text("Hello world!")
+    Validator = validator_factory()
     Validator.temp_src_table_properties = {"name": ""}
     Validator.temp_tgt_table_properties = {"name": ""}
-    Validator.get_and_create_table_properties = MagicMock()
-    Validator.evaluate_udfs = MagicMock()
-    Validator.create_sandbox_tables = MagicMock()
-    Validator.insert_into_presto_table = MagicMock(return_value=("", 1.1))
-    Validator.insert_into_hive_table = MagicMock(return_value=("", 1.1))
-    Validator.compare_tables = MagicMock()
-    Validator.validate_dml("test_original.sql", "test_translation.sql", "", "", "")
-    os.remove("test_original.sql")
-    os.remove("test_translation.sql")
-
-
-@pytest.mark.parametrize(['iou', 'iou_output', 'printout'], [
-    (1.0, 1.0, 'a and b are identical!\n'),
-    (0.5, 0.5, 'WARNING: a and b are not identical!\n')
-])
-def test_Validator_compare_tables(capsys, iou: float, iou_output: int, printout: str) -> None:
-    Validator = validation.HiveToPresto("", "", "", "")
+    Validator.get_and_create_table_properties = Mock()
+    Validator.evaluate_udfs = Mock()
+    Validator.create_sandbox_tables = Mock()
+    Validator.insert_into_presto_table = Mock(return_value=("", 1.1))
+    Validator.insert_into_hive_table = Mock(return_value=("", 1.1))
+    Validator.compare_tables = Mock()
+    Validator.validate_dml(str(path_original), str(path_translation), "", "", "")
+
+
+@pytest.mark.parametrize(['iou', 'iou_output', 'message'], [
+    (1.0, 1.0, 'a and b are identical!'),
+    (0.5, 0.5, 'a and b are not identical!')
+], ids=["identical", "not_identical"])
+def test_Validator_compare_tables(validator_factory: ValidatorFactory, caplog: pytest.LogCaptureFixture, iou: float, iou_output: int, message: str) -> None:
+    caplog.set_level(logging.INFO)
+    Validator = validator_factory()
     Validator.temp_src_table_properties = {"name": "a"}
     Validator.temp_tgt_table_properties = {"name": "b"}
-    Validator.TableComparator.compare_tables = MagicMock(return_value=iou)
+    Validator.TableComparator.compare_tables = Mock(return_value=iou)
     assert Validator.compare_tables() == iou_output
-    captured = capsys.readouterr()
-    assert captured.out == printout
+    assert caplog.messages == [message]
 
 
 def test_sanity_checks() -> None:
@@ -283,7 +310,7 @@ def test_sanity_checks() -> None:
         {"name": "a", "columns": ["c1", "c2"], "latest_partitions": {"c1": "2020-03-25"}, "partition_col_type": {"c1": "varchar"}},
         {"name": "b", "columns": ["c1", "c2"], "latest_partitions": {"c2": "2020-03-25"}, "partition_col_type": {"c1": "varchar"}}
     )
-])
+], ids=["different_columns", "different_partitions"])
 def test_sanity_checks_AssertionError(table_info_1: Dict, table_info_2: Dict) -> None:
     TableComparator = validation.TableComparator("", "", "")
     with pytest.raises(AssertionError):
@@ -301,54 +328,43 @@ def test_sanity_checks_AssertionError(table_info_1: Dict, table_info_2: Dict) ->
         ]
     ),
     (
-        {"name": "a", "columns": ["c1", "c2"], "latest_partitions": {"c1": "2020-03-25"}, "partition_col_type": {"c1": "varchar"}},
+        TABLE_INFO_1,
         {"name": "b", "columns": ["c1", "c3"], "latest_partitions": {"c1": "2020-03-25"}, "partition_col_type": {"c1": "varchar"}},
         [
             call("SELECT max(typeof(c1)), count(c1), count(distinct c1), max(typeof(c2)), count(c2), count(distinct c2) FROM test_db.a WHERE c1='2020-03-25' LIMIT 1", ""),
             call("SELECT max(typeof(c1)), count(c1), count(distinct c1), max(typeof(c2)), count(c2), count(distinct c2) FROM test_db.b WHERE c1='2020-03-25' LIMIT 1", "")
         ]
     )
-])
-def test_get_column_counts(mock_fetch: MagicMock, table_info_1: Dict, table_info_2: Dict, expected_calls: call) -> None:
+], ids=["no_partition", "with_partition"])
+def test_get_column_counts(mock_fetch: MagicMock, table_info_1: Dict, table_info_2: Dict, expected_calls: List) -> None:
     TableComparator = validation.TableComparator("test_db", "", "")
 
     TableComparator._get_column_counts(table_info_1, table_info_2)
-    mock_fetch.assert_has_calls(expected_calls)
+    assert mock_fetch.call_args_list == expected_calls
 
 
 @pytest.mark.parametrize(['table_info_1', 'table_info_2', 'column_counts', 'column_differences'], [
     (
-        {"name": "a", "columns": ["c1", "c2"], "latest_partitions": {"c1": "2020-03-25"}, "partition_col_type": {"c1": "varchar"}},
-        {"name": "b", "columns": ["c1", "c2"], "latest_partitions": {"c1": "2020-03-25"}, "partition_col_type": {"c1": "varchar"}},
+        TABLE_INFO_1,
+        TABLE_INFO_2,
         (("varchar", 10, 5, "varchar", 10, 5), ("varchar", 10, 5, "varchar", 9, 4)),
-        {"count_c2": {"table_1": 10, "table_2": 9}, "count_distinct_c2": {"table_1": 5, "table_2": 4}}
+        COLUMN_COUNT_DIFFERENCES_C2
     )
-])
+], ids=["count_c2_differs"])
 def test_compare_columns_between_two_tables(table_info_1, table_info_2, column_counts, column_differences) -> None:
     TableComparator = validation.TableComparator("", "", "")
-
-    def side_effect(table_info_1: Dict, table_info_2: Dict):
-        return column_counts
-    TableComparator._get_column_counts = MagicMock(side_effect=side_effect)
+    TableComparator._get_column_counts = lambda table_info_1, table_info_2: column_counts
     assert TableComparator._compare_columns_between_two_tables(table_info_1, table_info_2) == column_differences
 
 
 @patch('sql_translate.validation.fetch')
 @pytest.mark.parametrize(['table_info_1', 'table_info_2', 'expected'], [
     (
-        {"name": "a", "columns": ["c1", "c2"], "latest_partitions": {"c1": "2020-03-25"}, "partition_col_type": {"c1": "varchar"}},
-        {"name": "b", "columns": ["c1", "c2"], "latest_partitions": {"c1": "2020-03-25"}, "partition_col_type": {"c1": "varchar"}},
-        {
-            "1_count_table_1": 10,
-            "2_count_table_2": 10,
-            "3_count_distinct_table_1": 5,
-            "4_count_distinct_table_2": 5,
-            "5_count_distinct_table_1_minus_table_2": 1,
-            "6_count_distinct_table_2_minus_table_1": 1,
-            "7_count_distinct_intersection": 4
-        }
+        TABLE_INFO_1,
+        TABLE_INFO_2,
+        validation.RowDifferences(10, 10, 5, 5, 1, 1, 4)
     )
-])
+], ids=["with_partition"])
 def test_compare_rows_between_two_tables(mock_fetch: MagicMock, table_info_1, table_info_2, expected) -> None:
     mock_fetch.return_value = [
         ("1_count_table_1", 10),
@@ -363,77 +379,30 @@ def test_compare_rows_between_two_tables(mock_fetch: MagicMock, table_info_1, ta
     assert TableComparator._compare_rows_between_two_tables(table_info_1, table_info_2) == expected
 
 
-@pytest.mark.parametrize(['column_count_differences', 'row_differences', 'expected'], [
-    (
-        {},
-        {
-            "1_count_table_1": 10,
-            "2_count_table_2": 10,
-            "3_count_distinct_table_1": 5,
-            "4_count_distinct_table_2": 5,
-            "5_count_distinct_table_1_minus_table_2": 0,
-            "6_count_distinct_table_2_minus_table_1": 0,
-            "7_count_distinct_intersection": 5
-        },
-        1.0
-    ),
-    (
-        {},
-        {
-            "1_count_table_1": 10,
-            "2_count_table_2": 10,
-            "3_count_distinct_table_1": 5,
-            "4_count_distinct_table_2": 4,
-            "5_count_distinct_table_1_minus_table_2": 2,
-            "6_count_distinct_table_2_minus_table_1": 1,
-            "7_count_distinct_intersection": 3
-        },
-        0.5
-    ),
-    (
-        {"count_c2": {"table_1": 10, "table_2": 9}, "count_distinct_c2": {"table_1": 5, "table_2": 4}},
-        {
-            "1_count_table_1": 10,
-            "2_count_table_2": 10,
-            "3_count_distinct_table_1": 5,
-            "4_count_distinct_table_2": 5,
-            "5_count_distinct_table_1_minus_table_2": 0,
-            "6_count_distinct_table_2_minus_table_1": 0,
-            "7_count_distinct_intersection": 5
-        },
-        1.0
-    ),
-    (
-        {"count_c2": {"table_1": 10, "table_2": 9}, "count_distinct_c2": {"table_1": 5, "table_2": 4}},
-        {
-            "1_count_table_1": 10,
-            "2_count_table_2": 10,
-            "3_count_distinct_table_1": 5,
-            "4_count_distinct_table_2": 4,
-            "5_count_distinct_table_1_minus_table_2": 2,
-            "6_count_distinct_table_2_minus_table_1": 1,
-            "7_count_distinct_intersection": 3
-        },
-        0.5
-    ),
-    (
-        {"count_c2": {"table_1": 0, "table_2": 0}, "count_distinct_c2": {"table_1": 0, "table_2": 0}},
-        {
-            "1_count_table_1": 0,
-            "2_count_table_2": 0,
-            "3_count_distinct_table_1": 0,
-            "4_count_distinct_table_2": 0,
-            "5_count_distinct_table_1_minus_table_2": 0,
-            "6_count_distinct_table_2_minus_table_1": 0,
-            "7_count_distinct_intersection": 0
-        },
-        1
-    )
-])
+@pytest.mark.parametrize(['column_count_differences'], [
+    ({},),
+    (COLUMN_COUNT_DIFFERENCES_C2,)
+], ids=["no_column_diff", "column_diff"])
+@pytest.mark.parametrize(['row_differences', 'expected'], [
+    (ROW_DIFFERENCES_IDENTICAL, 1.0),
+    (ROW_DIFFERENCES_HALF, 0.5)
+], ids=["identical", "half"])
 def test_TableComparator_compare_tables(column_count_differences, row_differences, expected) -> None:
     TableComparator = validation.TableComparator("", "", "")
-    TableComparator._sanity_checks = MagicMock(return_value=None)
+    TableComparator._sanity_checks = Mock(return_value=None)
 
-    TableComparator._compare_columns_between_two_tables = MagicMock(return_value=column_count_differences)
-    TableComparator._compare_rows_between_two_tables = MagicMock(return_value=row_differences)
+    TableComparator._compare_columns_between_two_tables = Mock(return_value=column_count_differences)
+    TableComparator._compare_rows_between_two_tables = Mock(return_value=row_differences)
     assert TableComparator.compare_tables({"name": "a"}, {"name": "b"}) == expected
+
+
+def test_TableComparator_compare_tables_empty() -> None:
+    TableComparator = validation.TableComparator("", "", "")
+    TableComparator._sanity_checks = Mock(return_value=None)
+
+    TableComparator._compare_columns_between_two_tables = Mock(return_value={
+        "count_c2": {"table_1": 0, "table_2": 0},
+        "count_distinct_c2": {"table_1": 0, "table_2": 0}
+    })
+    TableComparator._compare_rows_between_two_tables = Mock(return_value=ROW_DIFFERENCES_EMPTY)
+    assert TableComparator.compare_tables({"name": "a"}, {"name": "b"}) == 1